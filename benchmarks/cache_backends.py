@@ -0,0 +1,97 @@
+"""Сравнение бэкендов кеша: LocMem, FileBased и SQLite из core.
+
+Замеряются типичные операции страничного кеша и счётчиков, а также
+доля попаданий, когда несколько процессов читают общий набор ключей.
+
+    python -m benchmarks.cache_backends
+"""
+import argparse
+import shutil
+import tempfile
+from multiprocessing import get_context
+
+from benchmarks.utils import configure_django, measure, report
+
+PAGE = 'x' * 20000
+KEYS = [f'page:{number}' for number in range(50)]
+
+
+def backends(directory):
+    from django.core.cache.backends.filebased import FileBasedCache
+    from django.core.cache.backends.locmem import LocMemCache
+
+    from core.cache.sqlite import SQLiteCache
+    params = {'OPTIONS': {'MAX_ENTRIES': 100000}}
+    return {
+        'locmem': lambda: LocMemCache('bench', params),
+        'filebased': lambda: FileBasedCache(f'{directory}/files', params),
+        'sqlite': lambda: SQLiteCache(f'{directory}/cache.sqlite3', params),
+    }
+
+
+def operations(cache):
+    cache.set('counter', 0)
+    for key in KEYS:
+        cache.set(key, PAGE)
+    return {
+        'get (hit, 20 KB)': lambda: cache.get('page:1'),
+        'get (miss)': lambda: cache.get('missing'),
+        'set (20 KB)': lambda: cache.set('page:1', PAGE),
+        'get_many (10 keys)': lambda: cache.get_many(KEYS[:10]),
+        'add (existing)': lambda: cache.add('page:1', PAGE),
+        'incr': lambda: cache.incr('counter'),
+    }
+
+
+def _writer(factory):
+    factory().set_many({key: PAGE for key in KEYS})
+
+
+def _reader(factory, queue):
+    cache = factory()
+    queue.put(sum(cache.get(key) is not None for key in KEYS) / len(KEYS))
+
+
+def shared_hit_ratio(factory, workers=4):
+    """Доля попаданий в процессах, не заполнявших кеш."""
+    context = get_context('fork')
+    writer = context.Process(target=_writer, args=(factory,))
+    writer.start()
+    writer.join()
+    queue = context.Queue()
+    processes = [
+        context.Process(target=_reader, args=(factory, queue))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    ratios = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return sum(ratios) / len(ratios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+    configure_django()
+    directory = tempfile.mkdtemp()
+    try:
+        for name, factory in backends(directory).items():
+            cache = factory()
+            for operation, func in operations(cache).items():
+                report(
+                    f'{name}: {operation}', measure(func, repeat=args.repeat)
+                )
+            cache.clear()
+            print(
+                f'{name}: hit ratio in other workers '
+                f'{shared_hit_ratio(factory):.0%}'
+            )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Сравнение профилей настроек dev и prod.
+
+Для каждого профиля замеряется время старта WSGI-приложения в новом
+процессе и время обработки запроса к странице группы через весь стек
+middleware.
+
+    python -m benchmarks.settings_profiles
+
+База и общий кеш профиля ``prod`` лежат во временном каталоге, а не
+в рабочих файлах проекта.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from statistics import median
+from time import perf_counter
+
+from benchmarks.utils import PROJECT_DIR, create_posts, measure, setup_django
+
+PROFILES = ('dev', 'prod')
+
+
+WORK_DIR = tempfile.TemporaryDirectory(prefix='yatube-bench-')
+
+
+def profile_env(profile):
+    env = {
+        **os.environ,
+        'YATUBE_ENV': profile,
+        'PYTHONPATH': PROJECT_DIR,
+        'YATUBE_DB': os.path.join(WORK_DIR.name, 'db.sqlite3'),
+        'YATUBE_CACHE_DIR': os.path.join(WORK_DIR.name, profile),
+    }
+    env.setdefault('SECRET_KEY', 'benchmark-only-secret-key')
+    return env
+
+
+def startup_time(profile, repeat):
+    """Медианное время импорта yatube.wsgi в новом процессе."""
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', 'import yatube.wsgi'],
+            cwd=PROJECT_DIR, env=profile_env(profile), check=True,
+        )
+        timings.append(perf_counter() - started)
+    return median(timings)
+
+
+def request_time(profile, repeat):
+    """Среднее время запроса, замеренное в дочернем процессе."""
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.settings_profiles',
+         '--child', '--repeat', str(repeat)],
+        env=profile_env(profile), check=True, stdout=subprocess.PIPE,
+    ).stdout
+    return json.loads(output.decode().splitlines()[-1])
+
+
+def child(repeat):
+    setup_django()
+    from django.test import Client
+    _, group = create_posts(10)
+    client = Client()
+    timings = measure(
+        lambda: client.get(f'/group/{group.slug}/'), repeat=repeat
+    )
+    print(json.dumps(sum(timings) / len(timings)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--startup-repeat', type=int, default=5)
+    parser.add_argument('--child', action='store_true')
+    args = parser.parse_args()
+    if args.child:
+        child(args.repeat)
+        return
+    print(f'{"profile":<8} {"startup, ms":>12} {"request, ms":>12}')
+    for profile in PROFILES:
+        startup = startup_time(profile, args.startup_repeat)
+        request = request_time(profile, args.repeat)
+        print(f'{profile:<8} {startup * 1000:12.1f} {request * 1000:12.3f}')
+
+
+if __name__ == '__main__':
+    main()
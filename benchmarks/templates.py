@@ -0,0 +1,78 @@
+"""Время отрисовки главной страницы с десятью постами.
+
+Сравнивает загрузчики шаблонов по умолчанию (файлы читаются и
+разбираются при каждом запросе) и кеширующий загрузчик из
+профиля ``prod`` (``yatube/settings/prod.py``).
+
+    python -m benchmarks.templates
+"""
+import argparse
+import copy
+
+from benchmarks.utils import create_posts, measure, report, setup_django
+
+
+def build_backend(settings, cached):
+    from django.template.backends.django import DjangoTemplates
+    config = copy.deepcopy(settings.TEMPLATES[0])
+    params = {
+        'NAME': 'cached' if cached else 'default',
+        'DIRS': config['DIRS'],
+        'APP_DIRS': not cached,
+        'OPTIONS': config['OPTIONS'],
+    }
+    # Одинаковые условия для обоих вариантов, как при DEBUG = True.
+    params['OPTIONS']['debug'] = True
+    if cached:
+        params['OPTIONS']['loaders'] = [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ]
+    return DjangoTemplates(params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.test import RequestFactory, override_settings
+
+    from posts.models import Post
+    from posts.utils import paginator
+
+    create_posts(settings.POSTS_PER_PAGE)
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    page_obj = paginator(request, Post.objects.all())
+    page_obj.object_list = list(page_obj.object_list)
+    context = {'page_obj': page_obj}
+
+    dummy_cache = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+    }
+    results = {}
+    with override_settings(CACHES=dummy_cache):
+        for cached in (False, True):
+            backend = build_backend(settings, cached)
+
+            def render():
+                template = backend.get_template('posts/index.html')
+                template.render(context, request)
+
+            results[cached] = report(
+                f'index, {"cached" if cached else "default"} loader',
+                measure(render, repeat=args.repeat),
+            )
+    print(f'speedup: {results[False] / results[True]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Общие помощники для замеров.
+
+Замеры запускаются из корня репозитория: ``python -m benchmarks.<имя>``.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from statistics import mean, median
+from time import perf_counter
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'yatube'
+)
+
+
+def configure_django(settings_module='yatube.settings'):
+    """Настроить Django без базы данных."""
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def setup_django(settings_module='yatube.settings'):
+    """Настроить Django и создать тестовую базу в памяти."""
+    configure_django(settings_module)
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    collect_static()
+
+
+def collect_static():
+    """Собрать статику во временный каталог, если профиль берёт имена
+    файлов из манифеста (``prod``): без него шаблоны не отрендерятся.
+    """
+    from django.conf import settings
+    from django.contrib.staticfiles.storage import ManifestFilesMixin
+    from django.core.management import call_command
+    from django.utils.module_loading import import_string
+    storage = import_string(settings.STATICFILES_STORAGE)
+    if not issubclass(storage, ManifestFilesMixin):
+        return
+    from django.test.utils import override_settings
+    static_root = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, static_root, True)
+    # Сигнал setting_changed пересоздаст уже созданное хранилище.
+    override_settings(STATIC_ROOT=static_root).enable()
+    call_command('collectstatic', interactive=False, verbosity=0)
+
+
+def create_posts(count):
+    """Создать автора, группу и count постов."""
+    from posts.models import Group, Post, User
+    author = User.objects.create_user(
+        username='bench', first_name='Бенч', last_name='Марк'
+    )
+    group = Group.objects.create(
+        title='Замеры', slug='bench', description='Группа для замеров'
+    )
+    Post.objects.bulk_create(
+        Post(author=author, group=group, text=f'Пост №{i}\nВторая строка')
+        for i in range(count)
+    )
+    return author, group
+
+
+def measure(func, repeat=200, warmup=10):
+    """Вызвать func repeat раз и вернуть времена вызовов в секундах."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        func()
+        timings.append(perf_counter() - started)
+    return timings
+
+
+def report(title, timings):
+    print(
+        f'{title:<40} mean {mean(timings) * 1000:8.3f} ms  '
+        f'median {median(timings) * 1000:8.3f} ms'
+    )
+    return mean(timings)
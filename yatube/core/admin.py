@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+from .models import OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Поля в админке очереди писем."""
+
+    list_display = (
+        'pk', 'subject', 'recipients', 'status', 'attempts', 'next_attempt',
+    )
+    list_filter = ('status',)
+    search_fields = ('recipients', 'subject',)
+    exclude = ('message',)
+    empty_value_display = '-пусто-'
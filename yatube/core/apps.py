@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+
+        if settings.SLOW_QUERY_MS is not None:
+            from django.db.backends.signals import connection_created
+
+            from .sql import install_slow_query_log
+
+            connection_created.connect(install_slow_query_log)
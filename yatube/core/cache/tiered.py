@@ -0,0 +1,313 @@
+import time
+import uuid
+from collections import Counter, OrderedDict
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+STAMP_KEY = 'tiered-stamp:{}'
+STATS_KEY = 'tiered-stats:{}'
+STATS = ('l1_hits', 'l1_misses', 'l2_hits', 'l2_misses')
+EPOCH = '*'
+# Общий тег ключей без пространства имён: сессий, cache_page, sorl.
+UNTAGGED = '-'
+MISSING = object()
+
+# Данные L1 общие для всех потоков процесса, как у LocMemCache.
+_stores = {}
+_stores_lock = Lock()
+
+
+class _Store:
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.stamps = {}
+        self.stamps_checked = 0
+        self.stats = Counter()
+        self.stats_flushed = time.monotonic()
+        self.lock = Lock()
+
+
+def tag_of(key, tags=None):
+    """Тег ключа: часть до первого двоеточия, например ``post``.
+
+    Если задан список ``tags``, своим тегом считаются только префиксы
+    из него. Остальные ключи делят тег ``UNTAGGED``.
+    """
+    prefix, colon, _ = key.partition(':')
+    if colon and (tags is None or prefix in tags):
+        return prefix
+    return UNTAGGED
+
+
+class TieredCache(BaseCache):
+    """Двухуровневый кеш: LRU в памяти процесса перед общим кешем.
+
+    ``LOCATION`` — имя общего кеша (L2) в ``CACHES``. Каждая запись L1
+    помнит метки версий своего тега и общей эпохи. Запись, удаление
+    и ``incr`` меняют метку тега в L2, и при следующей сверке меток, не
+    чаще раза в ``STAMP_CHECK_INTERVAL`` секунд, все процессы перестают
+    отдавать записи этого тега из L1. Поэтому часто меняющимся ключам
+    (например, сессиям) лучше дать свой тег через ``TAGS``.
+
+    Теги — префиксы ключей до двоеточия (или только из ``TAGS``).
+    Процесс следит не больше чем за ``MAX_TAGS`` тегами, ключи
+    остальных тегов в L1 не попадают и читаются из L2.
+
+    Дополнительные ``OPTIONS``: ``L1_MAX_ENTRIES``, ``L1_TIMEOUT``,
+    ``STAMP_CHECK_INTERVAL``, ``STATS_FLUSH_INTERVAL``, ``TAGS``,
+    ``MAX_TAGS``.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = location
+        self._l1_max_entries = options.get('L1_MAX_ENTRIES', 1000)
+        self._l1_timeout = options.get('L1_TIMEOUT', 60)
+        self._stamp_interval = options.get('STAMP_CHECK_INTERVAL', 1)
+        self._stats_interval = options.get('STATS_FLUSH_INTERVAL', 10)
+        self._tags = options.get('TAGS')
+        self._max_tags = options.get('MAX_TAGS', 100)
+        with _stores_lock:
+            self._store = _stores.setdefault(location, _Store())
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    # Метки версий.
+
+    def _refresh_stamps(self, force=False):
+        store = self._store
+        now = time.monotonic()
+        if not force and now - store.stamps_checked < self._stamp_interval:
+            return
+        store.stamps_checked = now
+        tags = set(store.stamps) | {EPOCH}
+        keys = {STAMP_KEY.format(tag): tag for tag in tags}
+        found = self.shared.get_many(list(keys))
+        for key, tag in keys.items():
+            stamp = found.get(key)
+            store.stamps[tag] = (
+                self._load_stamp(tag) if stamp is None else stamp
+            )
+
+    def _load_stamp(self, tag):
+        key = STAMP_KEY.format(tag)
+        stamp = self.shared.get(key)
+        if stamp is None:
+            self.shared.add(key, uuid.uuid4().hex, None)
+            stamp = self.shared.get(key)
+        return stamp
+
+    def _stamp(self, key):
+        """Метки ключа или ``None``, если его тег не отслеживается."""
+        stamps = self._store.stamps
+        if EPOCH not in stamps:
+            stamps[EPOCH] = self._load_stamp(EPOCH)
+        tag = tag_of(key, self._tags)
+        if tag not in stamps:
+            if len(stamps) > self._max_tags:
+                return None
+            stamps[tag] = self._load_stamp(tag)
+        return stamps[EPOCH], stamps[tag]
+
+    def invalidate(self, *tags):
+        """Сбросить записи тегов в L1 всех процессов."""
+        if not tags:
+            return
+        store = self._store
+        stamps = {tag: uuid.uuid4().hex for tag in tags}
+        self.shared.set_many(
+            {STAMP_KEY.format(tag): stamp for tag, stamp in stamps.items()},
+            None,
+        )
+        with store.lock:
+            for key in [
+                key for key in store.entries
+                if tag_of(key[1], self._tags) in tags
+            ]:
+                del store.entries[key]
+            # Новые записи этого процесса сразу получают новые метки.
+            for tag, stamp in stamps.items():
+                if tag in store.stamps:
+                    store.stamps[tag] = stamp
+
+    # L1.
+
+    def _l1_key(self, key, version):
+        return (self.version if version is None else version, key)
+
+    def _l1_get(self, key, version):
+        store = self._store
+        self._refresh_stamps()
+        current = self._stamp(key)
+        if current is None:
+            return MISSING
+        l1_key = self._l1_key(key, version)
+        with store.lock:
+            entry = store.entries.get(l1_key)
+            if entry is None:
+                return MISSING
+            value, expires, stamp = entry
+            if expires <= time.monotonic() or stamp != current:
+                del store.entries[l1_key]
+                return MISSING
+            store.entries.move_to_end(l1_key)
+            return value
+
+    def _l1_set(self, key, value, version, timeout=DEFAULT_TIMEOUT):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        timeout = self._l1_timeout if timeout is None else min(
+            timeout, self._l1_timeout
+        )
+        if timeout <= 0:
+            return
+        store = self._store
+        stamp = self._stamp(key)
+        if stamp is None:
+            return
+        l1_key = self._l1_key(key, version)
+        with store.lock:
+            store.entries[l1_key] = (value, time.monotonic() + timeout, stamp)
+            store.entries.move_to_end(l1_key)
+            while len(store.entries) > self._l1_max_entries:
+                store.entries.popitem(last=False)
+
+    def _l1_delete(self, key, version):
+        with self._store.lock:
+            self._store.entries.pop(self._l1_key(key, version), None)
+
+    # Статистика.
+
+    def _count(self, **counts):
+        store = self._store
+        store.stats.update(counts)
+        if time.monotonic() - store.stats_flushed >= self._stats_interval:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Добавить накопленную статистику к общей в L2."""
+        store = self._store
+        stats, store.stats = store.stats, Counter()
+        store.stats_flushed = time.monotonic()
+        for name, count in stats.items():
+            key = STATS_KEY.format(name)
+            self.shared.add(key, 0, None)
+            try:
+                self.shared.incr(key, count)
+            except ValueError:
+                self.shared.set(key, count, None)
+
+    def local_stats(self):
+        """Статистика попаданий этого процесса с момента сброса."""
+        return hit_rates(self._store.stats)
+
+    def shared_stats(self):
+        """Статистика попаданий всех процессов, сброшенная в L2."""
+        found = self.shared.get_many([STATS_KEY.format(n) for n in STATS])
+        return hit_rates({
+            name: found.get(STATS_KEY.format(name), 0) for name in STATS
+        })
+
+    def reset_stats(self):
+        self._store.stats.clear()
+        self.shared.delete_many([STATS_KEY.format(n) for n in STATS])
+
+    # Интерфейс кеша Django.
+
+    def get(self, key, default=None, version=None):
+        value = self._l1_get(key, version)
+        if value is not MISSING:
+            self._count(l1_hits=1)
+            return value
+        value = self.shared.get(key, MISSING, version=version)
+        if value is MISSING:
+            self._count(l1_misses=1, l2_misses=1)
+            return default
+        self._count(l1_misses=1, l2_hits=1)
+        self._l1_set(key, value, version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found, missing = {}, []
+        for key in keys:
+            value = self._l1_get(key, version)
+            if value is MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        shared = self.shared.get_many(missing, version=version)
+        for key, value in shared.items():
+            self._l1_set(key, value, version)
+        found.update(shared)
+        self._count(
+            l1_hits=len(found) - len(shared), l1_misses=len(missing),
+            l2_hits=len(shared), l2_misses=len(missing) - len(shared),
+        )
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        # Старое значение может лежать в L1 других процессов.
+        self.invalidate(tag_of(key, self._tags))
+        self._l1_set(key, value, version, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        stored = [key for key in data if key not in failed]
+        self.invalidate(*{tag_of(key, self._tags) for key in stored})
+        for key in stored:
+            self._l1_set(key, data[key], version, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._l1_set(key, value, version, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        # Другие процессы тоже должны перечитать счётчик из L2.
+        self._l1_delete(key, version)
+        self.invalidate(tag_of(key, self._tags))
+        return value
+
+    def has_key(self, key, version=None):
+        return (
+            self._l1_get(key, version) is not MISSING
+            or self.shared.has_key(key, version=version)  # noqa: W601
+        )
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.shared.delete_many(keys, version=version)
+        for key in keys:
+            self._l1_delete(key, version)
+        self.invalidate(*{tag_of(key, self._tags) for key in keys})
+
+    def clear(self):
+        self.shared.clear()
+        self.invalidate(EPOCH)
+        with self._store.lock:
+            self._store.entries.clear()
+
+
+def hit_rates(stats):
+    """Доли попаданий по уровням кеша."""
+    result = dict(stats)
+    for tier in ('l1', 'l2'):
+        hits = stats.get(f'{tier}_hits', 0)
+        total = hits + stats.get(f'{tier}_misses', 0)
+        result[f'{tier}_hit_rate'] = hits / total if total else None
+    return result
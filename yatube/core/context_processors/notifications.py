@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from posts.notifications import unread_count
+
+
+def unread_notifications(request):
+    """Добавляет число непрочитанных уведомлений.
+
+    Счётчик читается из кеша только если шаблон к нему обратился.
+    """
+    def count():
+        user = request.user
+        return unread_count(user) if user.is_authenticated else 0
+
+    return {'unread_notifications': SimpleLazyObject(count)}
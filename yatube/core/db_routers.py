@@ -0,0 +1,52 @@
+import random
+import threading
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+_state = threading.local()
+
+
+def pin_to_primary():
+    """Читать из основной базы до конца текущего запроса."""
+    _state.pinned = True
+
+
+def unpin():
+    _state.pinned = False
+    _state.written = False
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def has_written():
+    """Писал ли поток в базу после последнего ``unpin``."""
+    return getattr(_state, 'written', False)
+
+
+class PrimaryReplicaRouter:
+    """Чтение с реплик из ``DATABASE_REPLICAS``, запись в основную базу.
+
+    После первой записи поток закрепляется за основной базой, чтобы
+    запрос сразу видел то, что записал. Между запросами закрепление
+    переносит ``ReplicaPinningMiddleware``.
+    """
+
+    def db_for_read(self, model, **hints):
+        if is_pinned() or not settings.DATABASE_REPLICAS:
+            return PRIMARY
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        _state.written = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
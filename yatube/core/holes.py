@@ -0,0 +1,79 @@
+import hashlib
+import json
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+HOLE_RE = re.compile(r'<!--hole:([A-Za-z0-9_=-]+)-->')
+# Заголовки, которые хранятся в кеше вместе с телом страницы.
+CACHED_HEADERS = ('Content-Type', 'Surrogate-Key')
+
+
+def hole_marker(template_name, params):
+    """Метка на месте блока, который рендерится для каждого запроса."""
+    data = json.dumps([template_name, params]).encode()
+    return mark_safe(f'<!--hole:{urlsafe_b64encode(data).decode()}-->')
+
+
+def fill_holes(request, content):
+    """Отрендерить блоки для текущего пользователя и вставить их."""
+    def render_hole(match):
+        template_name, params = json.loads(urlsafe_b64decode(match[1]))
+        return render_to_string(template_name, params, request=request)
+
+    return HOLE_RE.sub(render_hole, content)
+
+
+def cache_with_holes(timeout, key_prefix, version=None):
+    """Кешировать общую для всех посетителей часть страницы.
+
+    Пока страница рендерится для кеша, тег ``{% hole %}`` оставляет
+    вместо личных блоков (шапка, кнопки, форма) метки. На каждый
+    запрос метки заменяются блоками, отрендеренными для текущего
+    пользователя, поэтому вошедшие пользователи получают тот же кеш,
+    что и анонимные.
+
+    ``version`` получает аргументы вью и возвращает метку версии
+    данных страницы; с новой меткой страница рендерится заново.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            parts = ['body', key_prefix, path]
+            if version is not None:
+                parts.insert(2, version(*args, **kwargs))
+            key = ':'.join(parts)
+            cached = cache.get(key)
+            if cached is None:
+                request.cache_holes = True
+                try:
+                    response = view(request, *args, **kwargs)
+                finally:
+                    request.cache_holes = False
+                if response.streaming:
+                    return response
+                content = response.content.decode(response.charset)
+                if response.status_code == 200:
+                    headers = {
+                        header: response[header]
+                        for header in CACHED_HEADERS
+                        if response.has_header(header)
+                    }
+                    cache.set(key, (content, headers), timeout)
+            else:
+                content, headers = cached
+                response = HttpResponse()
+                for header, value in headers.items():
+                    response[header] = value
+            response.content = fill_holes(request, content)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,103 @@
+import pickle
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который только ставит письма в очередь.
+
+    Письма отправляет команда ``send_outbox`` через бэкенд
+    ``OUTBOX_EMAIL_BACKEND``, поэтому медленный почтовый сервер не
+    задерживает ответ пользователю.
+    """
+
+    def send_messages(self, email_messages):
+        emails = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            message.connection = None
+            emails.append(OutgoingEmail(
+                subject=message.subject[:255],
+                recipients=', '.join(message.recipients()),
+                message=pickle.dumps(message),
+            ))
+        OutgoingEmail.objects.bulk_create(emails)
+        return len(emails)
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой: растёт вдвое с каждой неудачей."""
+    return timedelta(
+        seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_due(batch_size):
+    """Забрать пачку писем, которым пора уходить.
+
+    Письмо забирается условным UPDATE, поэтому несколько обработчиков
+    не отправят одно письмо дважды.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=settings.OUTBOX_LEASE)
+    due = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.PENDING, next_attempt__lte=now,
+    )
+    claimed = []
+    for email in due.order_by('next_attempt')[:batch_size]:
+        if due.filter(pk=email.pk).update(next_attempt=lease):
+            claimed.append(email)
+    return claimed
+
+
+def _failed(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.next_attempt = timezone.now() + retry_delay(email.attempts)
+
+
+def deliver_outbox(batch_size=100):
+    """Отправить пачку писем через одно соединение.
+
+    Возвращает пару: сколько писем отправлено и сколько не удалось.
+    """
+    emails = claim_due(batch_size)
+    if not emails:
+        return 0, 0
+    sent = 0
+    connection = get_connection(settings.OUTBOX_EMAIL_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            _failed(email, error)
+    else:
+        try:
+            for email in emails:
+                message = pickle.loads(email.message)
+                message.connection = connection
+                try:
+                    message.send()
+                except Exception as error:
+                    _failed(email, error)
+                else:
+                    email.status = OutgoingEmail.SENT
+                    email.sent = timezone.now()
+                    sent += 1
+        finally:
+            connection.close()
+    OutgoingEmail.objects.bulk_update(
+        emails,
+        ['status', 'attempts', 'next_attempt', 'sent', 'last_error'],
+    )
+    return sent, len(emails) - sent
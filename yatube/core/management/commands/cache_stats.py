@@ -0,0 +1,29 @@
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Показать долю попаданий по уровням двухуровневого кеша.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alias', default='default')
+        parser.add_argument(
+            '--reset', action='store_true', help='Обнулить статистику.',
+        )
+
+    def handle(self, *args, **options):
+        cache = caches[options['alias']]
+        if not hasattr(cache, 'shared_stats'):
+            raise CommandError(
+                f'Кеш {options["alias"]} не двухуровневый.'
+            )
+        stats = cache.shared_stats()
+        for tier in ('l1', 'l2'):
+            rate = stats[f'{tier}_hit_rate']
+            self.stdout.write(
+                f'{tier.upper()}: попаданий {stats[f"{tier}_hits"]}, '
+                f'промахов {stats[f"{tier}_misses"]}, '
+                f'доля {"-" if rate is None else f"{rate:.1%}"}'
+            )
+        if options['reset']:
+            cache.reset_stats()
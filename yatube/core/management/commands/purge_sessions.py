@@ -0,0 +1,41 @@
+from importlib import import_module
+from time import sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Удалить просроченные сессии небольшими пачками, не задерживая '
+        'блокировку записи в базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между пачками в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            raise CommandError(
+                f'{settings.SESSION_ENGINE} не хранит сессии в базе.'
+            )
+        model = store.get_model_class()
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            keys = list(
+                expired.values_list('session_key', flat=True)
+                [:options['batch_size']]
+            )
+            if not keys:
+                break
+            model.objects.filter(session_key__in=keys).delete()
+            deleted += len(keys)
+            sleep(options['pause'])
+        self.stdout.write(f'Удалено сессий: {deleted}')
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from core.sql import reset_slow_query_stats, slow_query_stats
+
+
+class Command(BaseCommand):
+    help = 'Показать медленные запросы, сгруппированные по форме SQL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--reset', action='store_true', help='Обнулить статистику.',
+        )
+
+    def handle(self, *args, **options):
+        for stats in slow_query_stats()[:options['limit']]:
+            self.stdout.write(
+                f'{stats["count"]} раз, всего {stats["total"] * 1000:.0f} мс, '
+                f'максимум {stats["max"] * 1000:.0f} мс, '
+                f'view: {", ".join(stats["views"]) or "-"}\n'
+                f'{stats["sql"]}\n'
+                f'параметры: {stats["params"]}'
+            )
+            if stats['plan']:
+                self.stdout.write(f'план:\n{stats["plan"]}')
+            self.stdout.write('')
+        if options['reset']:
+            reset_slow_query_stats()
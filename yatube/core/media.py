@@ -0,0 +1,143 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Открытый файл, ограниченный диапазоном байтов.
+
+    ``fileno`` и ``tell`` отдаются как есть, поэтому ``wsgi.file_wrapper``
+    сервера (у gunicorn — ``os.sendfile``) шлёт диапазон без копирования
+    в Python. Без sendfile файл читается порциями до конца диапазона.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def media_path(name):
+    """Путь к файлу внутри ``MEDIA_ROOT`` или ``Http404``.
+
+    Скрытые файлы и выход за пределы каталога не отдаются.
+    """
+    if any(part.startswith('.') for part in name.split('/')):
+        raise Http404
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(path):
+        raise Http404
+    return path
+
+
+def parse_range(header, size):
+    """Вернуть ``(start, end)`` одного диапазона, ``None`` или ``False``.
+
+    ``None`` — заголовка нет или он не поддерживается (несколько
+    диапазонов), тогда отдаётся весь файл. ``False`` — диапазон
+    за пределами файла.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    start, end = match.groups()
+    if start == '':
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return False
+    return start, end
+
+
+def accel_response(name, path, content_type):
+    """Передать отдачу файла фронт-серверу, если он это умеет."""
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_ACCEL == 'nginx':
+        # Заголовок должен быть ASCII, иначе Django закодирует его
+        # по RFC 2047 и nginx не найдёт файл.
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_PREFIX + quote(name)
+        )
+    else:
+        # mod_xsendfile раскодирует путь (XSendFileUnescape On).
+        response['X-Sendfile'] = quote(path)
+    return response
+
+
+def serve_media(request, path):
+    """Отдать загруженный файл из ``MEDIA_ROOT``.
+
+    С ``MEDIA_ACCEL`` Django только проверяет путь, а файл отдаёт nginx
+    (``X-Accel-Redirect``) или Apache (``X-Sendfile``). Иначе файл
+    отдаётся здесь же: с ``ETag``, ответом 304 и запросами ``Range``.
+    """
+    full_path = media_path(path)
+    content_type = mimetypes.guess_type(full_path)[0]
+    content_type = content_type or 'application/octet-stream'
+    if settings.MEDIA_ACCEL:
+        return accel_response(path, full_path, content_type)
+    stat = os.stat(full_path)
+    etag = quote_etag(f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = file_response(request, full_path, stat.st_size, etag)
+        response['Content-Type'] = content_type
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    patch_cache_control(
+        response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE
+    )
+    return response
+
+
+def file_response(request, path, size, etag):
+    response_range = None
+    if request.META.get('HTTP_IF_RANGE', etag) == etag:
+        response_range = parse_range(request.META.get('HTTP_RANGE', ''), size)
+    if response_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    file = open(path, 'rb')
+    if response_range is None:
+        response = FileResponse(file)
+        response['Content-Length'] = size
+    else:
+        start, end = response_range
+        response = FileResponse(RangeFile(file, start, end - start + 1))
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,139 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_cache_control
+
+from .db_routers import has_written, pin_to_primary, unpin
+from .sql import NPlusOneError, QueryCounter, set_current_view
+from .surrogates import HEADER as SURROGATE_KEY
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaPinningMiddleware:
+    """Читать свои записи: после записи ходить в основную базу.
+
+    Небезопасный запрос и всё, что идёт после записи в базу, читают из
+    основной базы. Ответ на такой запрос или на любой запрос, который
+    писал в базу, ставит cookie, и следующие ``REPLICA_PIN_SECONDS``
+    секунд запросы этого посетителя тоже не идут на реплики, пока те
+    догоняют основную базу. Закрепление, оставшееся в потоке от записей
+    вне запроса, сбрасывается в начале каждого запроса.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        unpin()
+        if (
+            request.method not in SAFE_METHODS
+            or settings.REPLICA_PIN_COOKIE_NAME in request.COOKIES
+        ):
+            pin_to_primary()
+        try:
+            response = self.get_response(request)
+            # Без реплик читать с отставанием неоткуда.
+            written = has_written() and settings.DATABASE_REPLICAS
+        finally:
+            unpin()
+        if request.method not in SAFE_METHODS or written:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE_NAME, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class SurrogateCacheControlMiddleware:
+    """Заголовки для внешнего HTTP-кеша у ответов с ``Surrogate-Key``.
+
+    Ответ анонимному посетителю без cookie прокси может хранить
+    ``SURROGATE_MAX_AGE`` секунд, пока его не сбросят по ключу.
+    Остальные ответы содержат личные блоки и помечаются ``private``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not response.has_header(SURROGATE_KEY):
+            return response
+        shared = (
+            request.method in SAFE_METHODS
+            and response.status_code == 200
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and not response.cookies
+        )
+        if shared:
+            patch_cache_control(
+                response, public=True, max_age=0,
+                s_maxage=settings.SURROGATE_MAX_AGE,
+            )
+        else:
+            patch_cache_control(response, private=True, max_age=0)
+        return response
+
+
+class NPlusOneMiddleware:
+    """Находит повторяющиеся однотипные запросы к базе (N+1).
+
+    Запросы каждой страницы группируются по форме SQL. Формы, которые
+    повторились ``NPLUSONE_THRESHOLD`` раз и больше, пишутся в лог с
+    местом в шаблоне и коде, а с ``NPLUSONE_MODE = 'raise'`` запрос
+    завершается ошибкой ``NPlusOneError``. Без ``NPLUSONE_MODE``
+    middleware отключается.
+    """
+
+    def __init__(self, get_response):
+        if not settings.NPLUSONE_MODE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter(settings.NPLUSONE_THRESHOLD)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        repeated = counter.repeated()
+        if not repeated:
+            return response
+        report = '\n'.join(
+            f'{count} x {sql}\n    {location}'
+            for sql, count, location in repeated
+        )
+        if settings.NPLUSONE_MODE == 'raise':
+            raise NPlusOneError(f'{request.path}:\n{report}')
+        logger.warning('N+1 на %s:\n%s', request.path, report)
+        return response
+
+
+class SlowQueryViewMiddleware:
+    """Подписывает медленные запросы именем view, которое их выполнило.
+
+    Работает вместе с ``core.sql.log_slow_queries``, поэтому без
+    ``SLOW_QUERY_MS`` отключается.
+    """
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_MS is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            set_current_view(None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        set_current_view(match.view_name if match else request.path)
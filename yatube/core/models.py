@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class CreatedModel(models.Model):
@@ -12,3 +13,43 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class OutgoingEmail(CreatedModel):
+    """Письмо в очереди на отправку."""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField('Тема', max_length=255)
+    recipients = models.TextField('Получатели')
+    message = models.BinaryField('Письмо')
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt = models.DateTimeField(
+        'Следующая попытка', default=timezone.now,
+    )
+    sent = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt'],
+                name='outgoing_email_due',
+            ),
+        ]
+
+    def __str__(self):
+        return self.subject
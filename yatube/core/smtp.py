@@ -0,0 +1,89 @@
+"""Простой SMTP-сервер для тестов и локальной разработки.
+
+Принимает письма на localhost и складывает их в список ``messages``::
+
+    with LocalSMTPServer() as server:
+        ...  # EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.port
+    server.messages
+"""
+import socketserver
+import threading
+from collections import namedtuple
+
+ReceivedMessage = namedtuple('ReceivedMessage', 'sender recipients data')
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.sender, self.recipients = None, []
+        self.reply('220 localhost ESMTP')
+        for raw in self.rfile:
+            command = raw.decode('utf-8', 'replace').strip()
+            verb = command[:4].lower()
+            handler = getattr(self, f'smtp_{verb}', None)
+            if handler is None:
+                self.reply('500 Command not recognized')
+            elif handler(command) is False:
+                break
+
+    def smtp_helo(self, command):
+        self.reply('250 localhost')
+
+    smtp_ehlo = smtp_helo
+
+    def smtp_mail(self, command):
+        if self.server.reject:
+            self.reply('451 Try again later')
+            return
+        self.sender, self.recipients = command[10:].strip('<> '), []
+        self.reply('250 OK')
+
+    def smtp_rcpt(self, command):
+        self.recipients.append(command[8:].strip('<> '))
+        self.reply('250 OK')
+
+    def smtp_data(self, command):
+        self.reply('354 End data with <CR><LF>.<CR><LF>')
+        lines = []
+        for line in self.rfile:
+            if line in (b'.\r\n', b'.\n'):
+                break
+            lines.append(line[1:] if line.startswith(b'..') else line)
+        self.server.messages.append(
+            ReceivedMessage(self.sender, self.recipients, b''.join(lines))
+        )
+        self.reply('250 OK')
+
+    def smtp_rset(self, command):
+        self.reply('250 OK')
+
+    smtp_noop = smtp_rset
+
+    def smtp_quit(self, command):
+        self.reply('221 Bye')
+        return False
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, reject=False):
+        super().__init__((host, port), _Handler)
+        self.messages = []
+        self.reject = reject
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
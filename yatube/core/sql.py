@@ -0,0 +1,290 @@
+import hashlib
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+SPACES_RE = re.compile(r'\s+')
+TRANSACTION_PREFIXES = ('SAVEPOINT', 'RELEASE', 'ROLLBACK', 'BEGIN', 'COMMIT')
+# Кадры самого детектора не показываются как место запроса.
+DETECTOR_FILES = tuple(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ('sql.py', 'middleware.py')
+)
+
+
+# Статистика хранится отдельными ключами, счётчики и списки меняются через
+# ``add`` и ``incr``: процессы не затирают записи друг друга.
+SLOW_QUERY_SLOTS_KEY = 'slowsql:slots'
+SLOW_QUERY_SLOT_KEY = 'slowsql:slot:{}'
+SLOW_QUERY_KEY = 'slowsql:{}'
+SLOW_QUERY_FIELD_KEY = 'slowsql:{}:{}'
+SLOW_QUERY_FIELDS = ('count', 'total', 'max', 'params', 'views')
+PARAMS_LENGTH = 500
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+}
+
+_state = threading.local()
+logger = logging.getLogger(__name__)
+
+
+class NPlusOneError(Exception):
+    """Запрос страницы повторяет однотипные SQL-запросы."""
+
+
+@contextmanager
+def repeated_queries_allowed():
+    """Не считать запросы блока: повторы в нём ожидаемы."""
+    _state.paused = getattr(_state, 'paused', 0) + 1
+    try:
+        yield
+    finally:
+        _state.paused -= 1
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """Форма запроса: SQL без значений и длины списков ``IN``.
+
+    Django передаёт параметры отдельно, поэтому одинаковые по форме
+    запросы обычно дают одну и ту же строку, и кеш срабатывает сразу.
+    """
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return SPACES_RE.sub(' ', sql).strip()
+
+
+def is_transaction_control(sql):
+    return sql.lstrip().upper().startswith(TRANSACTION_PREFIXES)
+
+
+def query_location():
+    """Где в коде проекта и в каком шаблоне выполняется запрос.
+
+    Обходит стек только при срабатывании, чтобы не замедлять запросы.
+    """
+    code = template = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if template is None and frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                template = f'{origin.template_name}:{token.lineno}'
+        if (
+            code is None
+            and filename.startswith(settings.BASE_DIR)
+            and filename not in DETECTOR_FILES
+        ):
+            code = f'{filename}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return ', '.join(filter(None, (template, code))) or 'неизвестно'
+
+
+class QueryCounter:
+    """Обёртка ``execute_wrapper``, считающая запросы по их форме.
+
+    Место вызова запоминается, когда форма набирает ``threshold``
+    повторов: у N+1 это тот же цикл, что и у остальных запросов.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.locations = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not (
+            getattr(_state, 'paused', 0) or is_transaction_control(sql)
+        ):
+            key = fingerprint(sql)
+            self.counts[key] += 1
+            if self.counts[key] == self.threshold:
+                self.locations[key] = query_location()
+        return execute(sql, params, many, context)
+
+    def repeated(self):
+        """Список ``(форма, число, место)`` повторившихся запросов."""
+        return [
+            (key, count, self.locations[key])
+            for key, count in self.counts.most_common()
+            if count >= self.threshold
+        ]
+
+
+def current_view():
+    return getattr(_state, 'view', None)
+
+
+def set_current_view(view):
+    _state.view = view
+
+
+def explain(connection, sql, params):
+    """План запроса в одну строку на шаг или текст ошибки."""
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is None:
+        return None
+    _state.explaining = True
+    try:
+        # Ошибка EXPLAIN откатывает только точку сохранения.
+        with transaction.atomic(using=connection.alias), \
+                connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            # У SQLite текст шага в последней колонке, у PostgreSQL
+            # колонка одна.
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except Exception as error:
+        return f'EXPLAIN не удался: {error}'
+    finally:
+        _state.explaining = False
+
+
+def _digest(value):
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def _incr(key, delta=1):
+    """Атомарно увеличить счётчик, создав его при первом обращении."""
+    cache.add(key, 0, None)
+    return cache.incr(key, delta)
+
+
+def _register(digest, name, value):
+    """Добавить ``value`` в список ``name`` формы, если его там нет."""
+    if cache.add(
+        SLOW_QUERY_FIELD_KEY.format(digest, f'seen:{_digest(value)}'),
+        True, None,
+    ):
+        slot = _incr(SLOW_QUERY_FIELD_KEY.format(digest, name))
+        cache.set(
+            SLOW_QUERY_FIELD_KEY.format(digest, f'{name}:{slot}'),
+            value, None,
+        )
+
+
+def record_slow_query(sql, params, duration, connection, many):
+    """Записать медленный запрос в лог и в статистику по его форме.
+
+    План запрашивается только для формы, которой ещё нет в статистике.
+    """
+    shape = fingerprint(sql)
+    digest = _digest(shape)
+    view = current_view()
+    logger.warning(
+        'Медленный запрос %.1f мс, %s: %s; параметры %s',
+        duration * 1000, view or '-', sql, repr(params)[:PARAMS_LENGTH],
+    )
+    key = SLOW_QUERY_KEY.format(digest)
+    if cache.get(key) is None:
+        plan = None
+        if not many and sql.lstrip().upper().startswith('SELECT'):
+            plan = explain(connection, sql, params)
+        if cache.add(key, {'sql': shape, 'plan': plan}, None):
+            slot = _incr(SLOW_QUERY_SLOTS_KEY)
+            cache.set(SLOW_QUERY_SLOT_KEY.format(slot), digest, None)
+    field = SLOW_QUERY_FIELD_KEY.format
+    micros = int(duration * 1_000_000)
+    _incr(field(digest, 'count'))
+    _incr(field(digest, 'total'), micros)
+    # Атомарного максимума в API кеша нет: при гонке может остаться
+    # меньшее из двух почти одновременных значений.
+    if micros > (cache.get(field(digest, 'max')) or 0):
+        cache.set(field(digest, 'max'), micros, None)
+    if view:
+        _register(digest, 'views', view)
+    cache.set(field(digest, 'params'), repr(params)[:PARAMS_LENGTH], None)
+
+
+def _slow_query_digests():
+    slots = cache.get(SLOW_QUERY_SLOTS_KEY) or 0
+    return list(cache.get_many([
+        SLOW_QUERY_SLOT_KEY.format(slot) for slot in range(1, slots + 1)
+    ]).values())
+
+
+def _slow_query_views(digest, count):
+    keys = [
+        SLOW_QUERY_FIELD_KEY.format(digest, f'views:{slot}')
+        for slot in range(1, count + 1)
+    ]
+    found = cache.get_many(keys)
+    return [found[key] for key in keys if key in found]
+
+
+def slow_query_stats():
+    """Статистика медленных запросов, самые затратные первыми."""
+    stats = []
+    for digest in _slow_query_digests():
+        info = cache.get(SLOW_QUERY_KEY.format(digest))
+        if info is None:
+            continue
+        keys = {
+            SLOW_QUERY_FIELD_KEY.format(digest, name): name
+            for name in SLOW_QUERY_FIELDS
+        }
+        values = {
+            keys[key]: value for key, value in cache.get_many(keys).items()
+        }
+        stats.append({
+            **info,
+            'count': values.get('count', 0),
+            'total': values.get('total', 0) / 1_000_000,
+            'max': values.get('max', 0) / 1_000_000,
+            'params': values.get('params', ''),
+            'views': _slow_query_views(digest, values.get('views', 0)),
+        })
+    return sorted(stats, key=lambda item: item['total'], reverse=True)
+
+
+def reset_slow_query_stats():
+    keys = [SLOW_QUERY_SLOTS_KEY]
+    slots = cache.get(SLOW_QUERY_SLOTS_KEY) or 0
+    keys += [SLOW_QUERY_SLOT_KEY.format(slot) for slot in range(1, slots + 1)]
+    for digest in _slow_query_digests():
+        field = SLOW_QUERY_FIELD_KEY.format
+        views_count = cache.get(field(digest, 'views')) or 0
+        keys.append(SLOW_QUERY_KEY.format(digest))
+        keys += [field(digest, name) for name in SLOW_QUERY_FIELDS]
+        for slot in range(1, views_count + 1):
+            keys.append(field(digest, f'views:{slot}'))
+        keys += [
+            field(digest, f'seen:{_digest(view)}')
+            for view in _slow_query_views(digest, views_count)
+        ]
+    cache.delete_many(keys)
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    """Обёртка ``execute_wrapper``: запросы дольше ``SLOW_QUERY_MS``."""
+    if getattr(_state, 'explaining', False):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - started
+    if duration * 1000 >= settings.SLOW_QUERY_MS:
+        record_slow_query(sql, params, duration, context['connection'], many)
+    return result
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    """Подключить ``log_slow_queries`` к новому соединению с базой."""
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
@@ -0,0 +1,137 @@
+import json
+import mimetypes
+import os
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Файлы без хеша в имени могут измениться при следующем деплое.
+SHORT_LIVED = 'public, max-age=60'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def accepted_encodings(header):
+    """Веса кодировок из ``Accept-Encoding``: ``{'gzip': 1.0, ...}``."""
+    weights = {}
+    for part in header.split(','):
+        token, *params = part.split(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[token] = weight
+    return weights
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.etag = f'{int(stat.st_mtime):x}-{stat.st_size:x}'
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.cache_control = IMMUTABLE if immutable else SHORT_LIVED
+        self.variants = [
+            (encoding, path + suffix, os.path.getsize(path + suffix))
+            for encoding, suffix in ENCODINGS
+            if os.path.exists(path + suffix)
+        ]
+
+    def pick(self, accept_encoding):
+        """Выбрать копию с наибольшим весом в ``Accept-Encoding``.
+
+        Возвращает ``(кодировка, путь, размер, ETag)``. У каждой копии
+        свой ETag, иначе кеши путали бы сжатый и несжатый ответ.
+        """
+        weights = accepted_encodings(accept_encoding)
+        best, best_weight = None, 0.0
+        for variant in self.variants:
+            weight = weights.get(variant[0], weights.get('*', 0.0))
+            if weight > best_weight:
+                best, best_weight = variant, weight
+        if best is None:
+            return None, self.path, self.size, f'"{self.etag}"'
+        encoding, path, size = best
+        suffix = dict(ENCODINGS)[encoding].lstrip('.')
+        return encoding, path, size, f'"{self.etag}-{suffix}"'
+
+
+class StaticFilesApplication:
+    """WSGI-обёртка, которая отдаёт собранную статику без Django.
+
+    Список файлов ``STATIC_ROOT`` читается один раз при старте. Файлы
+    с хешем в имени отдаются с ``immutable`` на год, сжатые копии
+    выбираются по ``Accept-Encoding``. Остальные запросы уходят в
+    ``application``.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = root or settings.STATIC_ROOT
+        self.prefix = prefix or settings.STATIC_URL
+        self.files = self.scan()
+
+    def hashed_names(self):
+        try:
+            with open(os.path.join(self.root, 'staticfiles.json')) as file:
+                return set(json.load(file)['paths'].values())
+        except (OSError, ValueError, KeyError):
+            return set()
+
+    def scan(self):
+        hashed = self.hashed_names()
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(directory, name)
+                url = os.path.relpath(path, self.root).replace(os.sep, '/')
+                files[url] = StaticFile(path, url in hashed)
+        return files
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(self.prefix):
+            return self.application(environ, start_response)
+        static = self.files.get(path[len(self.prefix):])
+        if static is None:
+            start_response('404 Not Found', [('Content-Type', 'text/plain')])
+            return [b'Not Found']
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed', [('Allow', 'GET, HEAD')])
+            return []
+        encoding, file_path, size, etag = static.pick(
+            environ.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        headers = [
+            ('Cache-Control', static.cache_control),
+            ('ETag', etag),
+        ]
+        if static.variants:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH', '')
+        if etag in (tag.strip() for tag in if_none_match.split(',')):
+            start_response('304 Not Modified', headers)
+            return []
+        headers += [
+            ('Content-Type', static.content_type),
+            ('Content-Length', str(size)),
+        ]
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(file_path, 'rb'))
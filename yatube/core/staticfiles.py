@@ -0,0 +1,48 @@
+import gzip
+import os
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.txt', '.xml', '.json', '.ico',
+                '.map', '.html')
+MIN_SIZE = 256
+
+
+def _compress(path):
+    """Записать рядом с файлом ``.gz`` и ``.br``, если они меньше."""
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < MIN_SIZE:
+        return
+    variants = {
+        '.gz': gzip.compress(data, compresslevel=9, mtime=0),
+        '.br': brotli.compress(data),
+    }
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(data) * 0.95:
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хранилище статики с хешами в именах и сжатыми копиями.
+
+    После ``collectstatic`` рядом с каждым текстовым файлом лежат
+    ``.gz`` и ``.br``. Их отдаёт
+    ``core.static_wsgi.StaticFilesApplication`` без сжатия на лету.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                names.update((name, hashed_name))
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in names:
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE:
+                _compress(self.path(name))
@@ -0,0 +1,86 @@
+import logging
+import threading
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Surrogate-Key'
+
+
+def add_surrogate_keys(response, *keys):
+    """Пометить ответ ключами, по которым его сбросит внешний кеш."""
+    current = response.get(HEADER, '').split()
+    response[HEADER] = ' '.join(dict.fromkeys([*current, *keys]))
+    return response
+
+
+class BasePurger:
+    """Сбрасывает во внешнем HTTP-кеше ответы с заданными ключами."""
+
+    def purge(self, keys):
+        raise NotImplementedError
+
+
+class LocalPurger(BasePurger):
+    """Заглушка для разработки и тестов: запоминает ключи."""
+
+    def __init__(self):
+        self.purged = []
+
+    def purge(self, keys):
+        self.purged.extend(keys)
+
+
+class HTTPPurger(BasePurger):
+    """Запрос ``PURGE`` с заголовком ``Surrogate-Key`` на
+    ``SURROGATE_PURGE_URL`` — так сбрасывают по ключам Varnish с xkey
+    и похожие прокси.
+    """
+
+    def purge(self, keys):
+        request = Request(
+            settings.SURROGATE_PURGE_URL,
+            method='PURGE',
+            headers={HEADER: ' '.join(keys)},
+        )
+        with urlopen(request, timeout=settings.SURROGATE_PURGE_TIMEOUT):
+            pass
+
+
+_purger = None
+_state = threading.local()
+
+
+def get_purger():
+    global _purger
+    if _purger is None:
+        _purger = import_string(settings.SURROGATE_PURGER)()
+    return _purger
+
+
+def _send_pending():
+    keys = list(getattr(_state, 'keys', ()))
+    _state.keys = {}
+    if not keys:
+        return
+    try:
+        get_purger().purge(keys)
+    except Exception:
+        logger.warning('Не удалось сбросить ключи %s', keys, exc_info=True)
+
+
+def purge(*keys):
+    """Сбросить ключи во внешнем кеше после фиксации транзакции.
+
+    Ключи, накопленные за транзакцию, уходят одним запросом. Ошибка
+    прокси не ломает запрос: ответы с этими ключами доживут до конца
+    ``SURROGATE_MAX_AGE``.
+    """
+    if not hasattr(_state, 'keys'):
+        _state.keys = {}
+    _state.keys.update(dict.fromkeys(keys))
+    transaction.on_commit(_send_pending)
@@ -0,0 +1,22 @@
+from django import template
+
+from core.holes import hole_marker
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, template_name, **params):
+    """Личный блок страницы, который не попадает в общий кеш.
+
+    Использование: ``{% hole 'includes/block.html' post_id=post.pk %}``.
+    Шаблон блока видит только переданные параметры, ``request`` и
+    данные контекст-процессоров. Вне ``cache_with_holes`` блок
+    рендерится на месте, как ``{% include %}``.
+    """
+    request = context.get('request')
+    if getattr(request, 'cache_holes', False):
+        return hole_marker(template_name, params)
+    block = context.template.engine.get_template(template_name)
+    with context.push(**params):
+        return block.render(context)
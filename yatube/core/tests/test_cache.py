@@ -0,0 +1,185 @@
+import shutil
+import tempfile
+import time
+from multiprocessing import get_context
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from core.cache.sqlite import SQLiteCache
+from core.cache.tiered import TieredCache, _Store
+
+
+def _incr_many(location, count):
+    cache = SQLiteCache(location, {})
+    for _ in range(count):
+        cache.incr('counter')
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.location = f'{self.directory}/cache.sqlite3'
+        self.cache = SQLiteCache(self.location, {})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_get_set_delete(self):
+        """Значения сохраняются, читаются пачкой и удаляются."""
+        self.cache.set('post', {'id': 1, 'text': 'Тестовый пост'})
+        self.cache.set('count', 10)
+        self.assertEqual(self.cache.get('post')['text'], 'Тестовый пост')
+        self.assertEqual(
+            self.cache.get_many(['post', 'count', 'missing']),
+            {'post': {'id': 1, 'text': 'Тестовый пост'}, 'count': 10}
+        )
+        self.cache.delete('post')
+        self.assertIsNone(self.cache.get('post'))
+        self.cache.clear()
+        self.assertNotIn('count', self.cache)
+
+    def test_shared_between_instances(self):
+        """Запись одного экземпляра видна другому на том же файле."""
+        self.cache.set('index_page', 'html')
+        other = SQLiteCache(self.location, {})
+        self.assertEqual(other.get('index_page'), 'html')
+        other.delete('index_page')
+        self.assertIsNone(self.cache.get('index_page'))
+
+    def test_expiry_and_add(self):
+        """add не перезаписывает живой ключ, но заменяет просроченный."""
+        self.assertTrue(self.cache.add('lock', 1, timeout=0.05))
+        self.assertFalse(self.cache.add('lock', 2))
+        time.sleep(0.06)
+        self.assertIsNone(self.cache.get('lock'))
+        self.assertTrue(self.cache.add('lock', 3))
+        self.assertEqual(self.cache.get('lock'), 3)
+
+    def test_incr_is_atomic(self):
+        """incr из нескольких процессов не теряет приращений."""
+        self.cache.set('counter', 0)
+        context = get_context('fork')
+        processes = [
+            context.Process(target=_incr_many, args=(self.location, 50))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(self.cache.get('counter'), 200)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_lru_eviction(self):
+        """При переполнении вытесняются давно не читавшиеся записи."""
+        cache = SQLiteCache(self.location, {'OPTIONS': {
+            'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 4,
+            'TOUCH_INTERVAL': 0, 'CULL_EVERY': 1,
+        }})
+        for number in range(4):
+            cache.set(f'key{number}', number)
+            time.sleep(0.01)
+        cache.get('key0')
+        cache.set('key4', 4)
+        self.assertEqual(
+            sorted(cache.get_many([f'key{n}' for n in range(5)])),
+            ['key0', 'key3', 'key4']
+        )
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tiered-tests',
+    },
+})
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.cache = TieredCache('shared', {})
+        self.cache._store = _Store()
+        # Второй рабочий процесс со своим L1 и тем же L2.
+        self.other = TieredCache('shared', {})
+        self.other._store = _Store()
+
+    def test_l1_serves_repeated_reads(self):
+        """Повторное чтение отдаётся из L1 без обращения к L2."""
+        self.cache.set('post:1', 'Тестовый пост')
+        caches['shared'].set('post:1', 'Изменено в обход кеша')
+        self.assertEqual(self.cache.get('post:1'), 'Тестовый пост')
+        self.assertEqual(self.other.get('post:1'), 'Изменено в обход кеша')
+        self.assertEqual(self.other.get('post:1'), 'Изменено в обход кеша')
+        stats = self.other.local_stats()
+        self.assertEqual(stats['l1_hit_rate'], 0.5)
+        self.assertEqual(stats['l2_hit_rate'], 1)
+
+    def test_delete_invalidates_other_processes(self):
+        """Удаление ключа в одном процессе сбрасывает записи тега в L1
+        других процессов.
+        """
+        self.cache.set('post:1', 'Тестовый пост')
+        self.cache.set('group:1', 'Тестовая группа')
+        self.assertEqual(self.other.get('post:1'), 'Тестовый пост')
+        self.assertEqual(self.other.get('group:1'), 'Тестовая группа')
+        self.cache.delete('post:1')
+        self.other._store.stamps_checked = 0
+        self.assertIsNone(self.other.get('post:1'))
+        self.other.get('group:1')
+        self.assertEqual(self.other.local_stats()['l1_hits'], 1)
+
+    def test_set_invalidates_other_processes(self):
+        """Перезапись ключа видна другим процессам после сверки меток."""
+        self.cache.set('session1', 'старая сессия')
+        self.assertEqual(self.other.get('session1'), 'старая сессия')
+        self.cache.set('session1', 'новая сессия')
+        self.assertEqual(self.cache.get('session1'), 'новая сессия')
+        self.other._store.stamps_checked = 0
+        self.assertEqual(self.other.get('session1'), 'новая сессия')
+        self.cache.set_many({'session1': 'ещё новее'})
+        self.other._store.stamps_checked = 0
+        self.assertEqual(self.other.get('session1'), 'ещё новее')
+
+    def test_incr_invalidates_other_processes(self):
+        self.cache.set('count:posts:all', 1)
+        self.assertEqual(self.other.get('count:posts:all'), 1)
+        self.cache.incr('count:posts:all')
+        self.other._store.stamps_checked = 0
+        self.assertEqual(self.other.get('count:posts:all'), 2)
+
+    def test_keys_without_namespace_share_one_tag(self):
+        """Ключи без двоеточия не заводят по тегу на каждый ключ."""
+        for number in range(100):
+            self.cache.set(f'session{number}', number)
+        self.assertEqual(set(self.cache._store.stamps), {'*', '-'})
+        self.assertEqual(self.cache.get('session7'), 7)
+        self.cache.delete('session7')
+        self.other._store.stamps_checked = 0
+        self.assertIsNone(self.other.get('session7'))
+
+    def test_number_of_tags_is_bounded(self):
+        """Ключи сверх MAX_TAGS тегов читаются мимо L1."""
+        cache = TieredCache('shared', {'OPTIONS': {'MAX_TAGS': 3}})
+        cache._store = _Store()
+        for number in range(10):
+            cache.set(f'tag{number}:key', number)
+        self.assertLessEqual(len(cache._store.stamps), 4)
+        caches['shared'].set('tag9:key', 'L2')
+        self.assertEqual(cache.get('tag9:key'), 'L2')
+        self.assertEqual(cache.get('tag0:key'), 0)
+
+    def test_clear_and_shared_stats(self):
+        """Очистка сбрасывает L1 везде, статистика копится в L2."""
+        self.cache.set('post:1', 'Тестовый пост')
+        self.other.get('post:1')
+        self.cache.clear()
+        self.other._store.stamps_checked = 0
+        self.assertIsNone(self.other.get('post:1'))
+        self.other.flush_stats()
+        self.assertEqual(
+            self.cache.shared_stats()['l2_hits'], 1
+        )
@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.counters import view_counter
+from posts.models import Comment, Group, Post, User
+
+
+class HolePunchingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def tearDown(self):
+        view_counter.clear()
+
+    def template_names(self, response):
+        return [template.name for template in response.templates]
+
+    def test_body_is_shared_between_users(self):
+        """Страница рендерится один раз, личные блоки — для каждого."""
+        address = reverse('posts:post_detail', args=(self.post.pk,))
+        response = self.author_client.get(address)
+        self.assertIn('posts/post_detail.html', self.template_names(response))
+        self.assertContains(response, 'Редактировать запись')
+        self.assertContains(response, 'Пользователь: Author')
+
+        response = self.guest_client.get(address)
+        self.assertNotIn(
+            'posts/post_detail.html', self.template_names(response)
+        )
+        self.assertContains(response, 'Тестовый пост')
+        self.assertNotContains(response, 'Редактировать запись')
+        self.assertNotContains(response, 'Добавить комментарий')
+        self.assertNotContains(response, '<!--hole:')
+
+        response = self.reader_client.get(address)
+        self.assertNotIn(
+            'posts/post_detail.html', self.template_names(response)
+        )
+        self.assertContains(response, 'Пользователь: Reader')
+        self.assertContains(response, 'Добавить комментарий')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertNotContains(response, 'Редактировать запись')
+
+    def test_follow_button_is_personal(self):
+        address = reverse('posts:profile', args=(self.author.username,))
+        self.assertNotContains(self.author_client.get(address), 'Подписаться')
+        self.assertContains(self.reader_client.get(address), 'Подписаться')
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=(self.author.username,))
+        )
+        self.assertContains(self.reader_client.get(address), 'Отписаться')
+
+    def test_changes_rebuild_body(self):
+        """Новый комментарий и новый пост группы сбрасывают кеш страниц."""
+        detail = reverse('posts:post_detail', args=(self.post.pk,))
+        group = reverse('posts:group_list', args=(self.group.slug,))
+        self.guest_client.get(detail)
+        self.guest_client.get(group)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Свежий комментарий',
+        )
+        Post.objects.create(
+            author=self.author, group=self.group, text='Свежий пост',
+        )
+        self.assertContains(
+            self.guest_client.get(detail), 'Свежий комментарий'
+        )
+        self.assertContains(self.guest_client.get(group), 'Свежий пост')
+
+    def test_index_and_old_group_rebuilt(self):
+        """Изменение поста сбрасывает главную и ленту прежней группы."""
+        other = Group.objects.create(
+            title='Другая группа', slug='other-slug', description='Другая',
+        )
+        post = Post.objects.create(
+            author=self.author, group=self.group, text='Переезжающий пост',
+        )
+        index = reverse('posts:index')
+        group = reverse('posts:group_list', args=(self.group.slug,))
+        self.assertContains(self.guest_client.get(index), 'Переезжающий')
+        self.assertContains(self.guest_client.get(group), 'Переезжающий')
+        post.text = 'Переехавший пост'
+        post.group = other
+        post.save()
+        self.assertContains(self.guest_client.get(index), 'Переехавший')
+        self.assertNotContains(self.guest_client.get(group), 'Переезжающий')
@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.core.mail import send_mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import OutgoingEmail
+from core.smtp import LocalSMTPServer
+from posts.models import User
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.OutboxEmailBackend',
+    OUTBOX_EMAIL_BACKEND=SMTP_BACKEND,
+    EMAIL_HOST='127.0.0.1',
+    OUTBOX_MAX_ATTEMPTS=2,
+)
+class OutboxTests(TestCase):
+    def send(self, port):
+        with self.settings(EMAIL_PORT=port):
+            call_command('send_outbox', stdout=StringIO())
+
+    def test_password_reset_is_queued(self):
+        """Сброс пароля ставит письмо в очередь, а не отправляет его."""
+        User.objects.create_user(
+            username='TestUser', email='user@example.com', password='1'
+        )
+        with LocalSMTPServer() as server:
+            self.client.post(
+                reverse('users:password_reset_form'),
+                {'email': 'user@example.com'},
+            )
+        self.assertEqual(server.messages, [])
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.recipients, 'user@example.com')
+        self.assertEqual(email.status, OutgoingEmail.PENDING)
+
+    def test_worker_sends_batch(self):
+        """Обработчик отправляет очередь через SMTP."""
+        for number in range(3):
+            send_mail(
+                f'Письмо {number}', 'Текст', 'from@example.com',
+                [f'user{number}@example.com'],
+            )
+        with LocalSMTPServer() as server:
+            self.send(server.port)
+        self.assertEqual(
+            sorted(message.recipients[0] for message in server.messages),
+            [f'user{number}@example.com' for number in range(3)]
+        )
+        self.assertFalse(
+            OutgoingEmail.objects.exclude(status=OutgoingEmail.SENT).exists()
+        )
+
+    def test_retry_with_backoff(self):
+        """Неудачная отправка откладывается, а после лимита попыток
+        письмо помечается неотправленным.
+        """
+        send_mail('Тема', 'Текст', 'from@example.com', ['u@example.com'])
+        with LocalSMTPServer(reject=True) as server:
+            self.send(server.port)
+            email = OutgoingEmail.objects.get()
+            self.assertEqual(email.status, OutgoingEmail.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt, timezone.now())
+            self.send(server.port)
+            self.assertEqual(OutgoingEmail.objects.get().attempts, 1)
+            OutgoingEmail.objects.update(next_attempt=timezone.now())
+            self.send(server.port)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+        self.assertIn('451', email.last_error)
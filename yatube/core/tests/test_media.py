@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MediaTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(MEDIA_ROOT, 'posts'), exist_ok=True)
+        for name in ('image.gif', 'фото кота.gif'):
+            with open(os.path.join(MEDIA_ROOT, 'posts', name), 'wb') as f:
+                f.write(CONTENT)
+        cls.url = reverse('posts:media', args=['posts/image.gif'])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_full_file_and_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_ranges(self):
+        """Отдаётся только запрошенный диапазон байтов."""
+        cases = {
+            'bytes=10-19': (10, 19),
+            'bytes=1000-': (1000, 1023),
+            'bytes=-4': (1020, 1023),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(
+                    response['Content-Range'], f'bytes {start}-{end}/1024'
+                )
+                self.assertEqual(
+                    b''.join(response.streaming_content),
+                    CONTENT[start:end + 1]
+                )
+
+    def test_unsatisfiable_and_stale_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2000-')
+        self.assertEqual(response.status_code, 416)
+        response = self.client.get(
+            self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_hidden_and_missing_files(self):
+        for path in ('posts/missing.gif', '.secret', 'posts/../../x'):
+            with self.subTest(path=path):
+                response = self.client.get('/media/' + path)
+                self.assertEqual(response.status_code, 404)
+
+    @override_settings(MEDIA_ACCEL='nginx')
+    def test_accel_redirect(self):
+        """С nginx Django отдаёт только заголовок с внутренним путём."""
+        response = self.client.get(self.url)
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/posts/image.gif'
+        )
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_ACCEL='nginx')
+    def test_accel_redirect_quotes_name(self):
+        response = self.client.get(
+            reverse('posts:media', args=['posts/фото кота.gif'])
+        )
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            '/protected-media/posts/%D1%84%D0%BE%D1%82%D0%BE'
+            '%20%D0%BA%D0%BE%D1%82%D0%B0.gif'
+        )
+
+    @override_settings(MEDIA_ACCEL='apache')
+    def test_sendfile(self):
+        response = self.client.get(self.url)
+        self.assertEqual(
+            response['X-Sendfile'],
+            os.path.join(MEDIA_ROOT, 'posts', 'image.gif')
+        )
@@ -0,0 +1,101 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.middleware import NPlusOneMiddleware
+from core.sql import NPlusOneError, fingerprint
+from posts.counters import view_counter
+from posts.models import (Comment, Follow, Group, Notification, Post,
+                          Recommendation)
+
+User = get_user_model()
+
+
+def users_one_by_one(request):
+    for pk in User.objects.values_list('pk', flat=True):
+        User.objects.get(pk=pk)
+    return HttpResponse()
+
+
+class FingerprintTests(TestCase):
+    def test_values_are_dropped(self):
+        """Запросы одной формы дают одинаковый отпечаток."""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE a = 'x' AND b IN (%s, %s)"),
+            fingerprint("SELECT  *  FROM t WHERE a = 'y''z' AND b IN (%s)"),
+        )
+        self.assertNotEqual(
+            fingerprint('SELECT a FROM t WHERE id = 1'),
+            fingerprint('SELECT b FROM t WHERE id = 1'),
+        )
+
+
+@override_settings(NPLUSONE_THRESHOLD=3)
+class NPlusOneMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        for number in range(3):
+            User.objects.create_user(username=f'reader{number}')
+        cls.post = Post.objects.create(author=cls.author, text='Текст')
+
+    def setUp(self):
+        self.request = RequestFactory().get('/loop/')
+
+    def tearDown(self):
+        view_counter.clear()
+
+    @override_settings(NPLUSONE_MODE='raise')
+    def test_raise_mode(self):
+        middleware = NPlusOneMiddleware(users_one_by_one)
+        with self.assertRaisesMessage(NPlusOneError, 'test_nplusone.py'):
+            middleware(self.request)
+
+    @override_settings(NPLUSONE_MODE='log')
+    def test_log_mode(self):
+        middleware = NPlusOneMiddleware(users_one_by_one)
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            response = middleware(self.request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('4 x SELECT', logs.output[0])
+
+    @override_settings(NPLUSONE_MODE='raise')
+    def test_post_comments_load_authors_at_once(self):
+        """Авторы комментариев не запрашиваются по одному."""
+        for user in User.objects.exclude(pk=self.author.pk):
+            Comment.objects.create(post=self.post, author=user, text='Да')
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(NPLUSONE_MODE='raise')
+    def test_admin_changelists(self):
+        """Списки в админке не запрашивают связанные объекты по одному."""
+        readers = list(User.objects.exclude(pk=self.author.pk))
+        for number in range(3):
+            group = Group.objects.create(
+                title=f'Группа {number}', slug=f'group-{number}'
+            )
+            post = Post.objects.create(
+                author=readers[number], group=group, text='Текст'
+            )
+            Comment.objects.create(post=post, author=readers[number])
+            Follow.objects.create(user=readers[number], author=self.author)
+            Notification.objects.create(user=readers[number], post=post)
+            Recommendation.objects.create(
+                user=readers[number], author=self.author, score=1
+            )
+        self.client.force_login(
+            User.objects.create_superuser('admin', 'admin@example.com', 'x')
+        )
+        for model in admin.site._registry:
+            opts = model._meta
+            with self.subTest(model=opts.model_name):
+                response = self.client.get(
+                    reverse(f'admin:{opts.app_label}_{opts.model_name}_'
+                            'changelist')
+                )
+                self.assertEqual(response.status_code, 200)
@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.db_routers import PrimaryReplicaRouter, pin_to_primary, unpin
+from core.middleware import ReplicaPinningMiddleware
+from posts.models import Post
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        unpin()
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        unpin()
+
+    def serve(self, request, write=False):
+        """Пропустить запрос через middleware и вернуть базу чтения."""
+        used = []
+
+        def view(request):
+            if write:
+                self.router.db_for_write(Post)
+            used.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(request)
+        return used[0], response
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_read_after_write_goes_to_primary(self):
+        """После записи запрос читает из основной базы."""
+        db, _ = self.serve(self.factory.get('/'), write=True)
+        self.assertEqual(db, 'default')
+        db, _ = self.serve(self.factory.get('/'))
+        self.assertEqual(db, 'replica')
+
+    def test_unsafe_request_pins_next_requests(self):
+        """POST ставит cookie, и следующие запросы читают из основной
+        базы.
+        """
+        db, response = self.serve(self.factory.post('/'))
+        self.assertEqual(db, 'default')
+        cookie = response.cookies[settings.REPLICA_PIN_COOKIE_NAME]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_PIN_SECONDS)
+        request = self.factory.get('/')
+        request.COOKIES[settings.REPLICA_PIN_COOKIE_NAME] = '1'
+        db, response = self.serve(request)
+        self.assertEqual(db, 'default')
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE_NAME, response.cookies)
+
+    def test_safe_request_with_write_pins_next_requests(self):
+        """GET, который пишет в базу, тоже ставит cookie."""
+        _, response = self.serve(self.factory.get('/'), write=True)
+        self.assertIn(settings.REPLICA_PIN_COOKIE_NAME, response.cookies)
+
+    def test_pin_outside_request_is_reset(self):
+        """Закрепление от записи после ответа не переходит в следующий
+        запрос.
+        """
+        pin_to_primary()
+        db, response = self.serve(self.factory.get('/'))
+        self.assertEqual(db, 'replica')
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE_NAME, response.cookies)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
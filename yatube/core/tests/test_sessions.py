@@ -0,0 +1,78 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from posts.models import User
+
+
+class AnonymousSessionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='TestUser', password='Pa$$w0rd-yatube'
+        )
+
+    def test_anonymous_get_does_not_create_session(self):
+        """Анонимный GET не пишет сессию и не ставит cookie."""
+        client = Client()
+        with self.assertNumQueries(0):
+            response = client.get(reverse('about:author'))
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_login_creates_session(self):
+        """Вход на сайт создаёт сессию, дальше она работает как обычно."""
+        client = Client()
+        response = client.post(
+            reverse('users:login'),
+            {'username': 'TestUser', 'password': 'Pa$$w0rd-yatube'},
+        )
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_reset_link_for_anonymous(self):
+        """Ссылка сброса пароля открывает форму нового пароля."""
+        response = Client().get(
+            reverse('users:password_reset_confirm', args=[
+                urlsafe_base64_encode(force_bytes(self.user.pk)),
+                default_token_generator.make_token(self.user),
+            ]),
+            follow=True,
+        )
+        self.assertTrue(response.context['validlink'])
+
+    def test_purge_sessions_in_batches(self):
+        """Команда удаляет только просроченные сессии."""
+        now = timezone.now()
+        Session.objects.bulk_create(
+            Session(
+                session_key=f'expired{number:032}',
+                session_data='',
+                expire_date=now - timedelta(days=1),
+            )
+            for number in range(5)
+        )
+        Session.objects.create(
+            session_key='alive', session_data='',
+            expire_date=now + timedelta(days=1),
+        )
+        output = StringIO()
+        call_command(
+            'purge_sessions', batch_size=2, pause=0, stdout=output
+        )
+        self.assertIn('5', output.getvalue())
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['alive']
+        )
@@ -0,0 +1,64 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.sql import log_slow_queries, record_slow_query, slow_query_stats
+from posts.models import Post
+
+
+@override_settings(SLOW_QUERY_MS=0)
+class SlowQueryLogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_stats_grouped_by_shape_with_plan(self):
+        """Запросы одной формы копятся в одной записи с планом."""
+        with self.assertLogs('core.sql', 'WARNING') as logs, \
+                connection.execute_wrapper(log_slow_queries):
+            for username in ('first', 'second'):
+                list(Post.objects.filter(author__username=username))
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn("('second',)", logs.output[1])
+        stats = slow_query_stats()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]['count'], 2)
+        self.assertIn('SEARCH posts_post', stats[0]['plan'])
+
+    def test_view_name_and_command(self):
+        with self.assertLogs('core.sql', 'WARNING'), \
+                connection.execute_wrapper(log_slow_queries):
+            self.client.get(reverse('posts:index'))
+        views = {view for stats in slow_query_stats()
+                 for view in stats['views']}
+        self.assertIn('posts:index', views)
+        out = StringIO()
+        call_command('slow_queries', '--reset', stdout=out)
+        self.assertIn('posts:index', out.getvalue())
+        self.assertEqual(slow_query_stats(), [])
+
+    def test_concurrent_records_are_not_lost(self):
+        """Запись другого процесса между чтением и записью не теряется."""
+        sql = 'UPDATE posts_post SET views = 1'
+        get = cache.get
+        interleaved = []
+
+        def get_then_record(*args, **kwargs):
+            value = get(*args, **kwargs)
+            if not interleaved:
+                interleaved.append(True)
+                record_slow_query(sql, (), 0.002, connection, True)
+            return value
+
+        with self.assertLogs('core.sql', 'WARNING'), \
+                mock.patch.object(cache, 'get', get_then_record):
+            record_slow_query(sql, (), 0.001, connection, True)
+        stats = slow_query_stats()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]['count'], 2)
+        self.assertAlmostEqual(stats[0]['total'], 0.003)
+        self.assertAlmostEqual(stats[0]['max'], 0.002)
@@ -0,0 +1,111 @@
+import shutil
+import tempfile
+
+import brotli
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from core.static_wsgi import IMMUTABLE, StaticFilesApplication
+
+STATIC_ROOT = tempfile.mkdtemp()
+STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+
+
+@override_settings(STATIC_ROOT=STATIC_ROOT, STATICFILES_STORAGE=STORAGE)
+class StaticFilesTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        from django.contrib.staticfiles.storage import staticfiles_storage
+
+        cls.hashed = staticfiles_storage.stored_name('js/feed.js')
+        cls.app = StaticFilesApplication(
+            cls.fallback, root=STATIC_ROOT, prefix='/static/'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @staticmethod
+    def fallback(environ, start_response):
+        start_response('200 OK', [])
+        return [b'django']
+
+    def call(self, path, **environ):
+        result = {}
+
+        def start_response(status, headers):
+            result['status'] = status
+            result['headers'] = dict(headers)
+
+        environ = dict({'PATH_INFO': path, 'REQUEST_METHOD': 'GET'},
+                       **environ)
+        body = b''.join(self.app(environ, start_response))
+        return result['status'], result['headers'], body
+
+    def test_hashed_file_is_immutable_and_compressed(self):
+        """Файл с хешем отдаётся сжатым и с кешем на год."""
+        status, headers, body = self.call(
+            '/static/' + self.hashed, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Cache-Control'], IMMUTABLE)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(headers['Content-Length']), len(body))
+
+    def test_brotli_is_preferred(self):
+        """Копия ``.br`` собирается и отдаётся клиентам, которые её
+        понимают.
+        """
+        _, _, plain = self.call('/static/' + self.hashed)
+        _, headers, body = self.call(
+            '/static/' + self.hashed, HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        self.assertEqual(headers['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(body), plain)
+
+    def test_plain_response_and_not_modified(self):
+        """Без Accept-Encoding файл отдаётся как есть, по ETag — 304."""
+        status, headers, _ = self.call('/static/' + self.hashed)
+        self.assertNotIn('Content-Encoding', headers)
+        status, _, body = self.call(
+            '/static/' + self.hashed, HTTP_IF_NONE_MATCH=headers['ETag']
+        )
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, b'')
+
+    def test_accept_encoding_weights(self):
+        """Кодировка с q=0 не отдаётся, у каждой копии свой ETag."""
+        address = '/static/' + self.hashed
+        _, plain, _ = self.call(address, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', plain)
+        _, gzip, _ = self.call(
+            address, HTTP_ACCEPT_ENCODING='br;q=0, gzip;q=0.5'
+        )
+        self.assertEqual(gzip['Content-Encoding'], 'gzip')
+        self.assertNotEqual(gzip['ETag'], plain['ETag'])
+        status, _, _ = self.call(
+            address, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=plain['ETag'],
+        )
+        self.assertEqual(status, '200 OK')
+
+    def test_unhashed_name_has_short_cache(self):
+        _, headers, _ = self.call('/static/js/feed.js')
+        self.assertNotEqual(headers['Cache-Control'], IMMUTABLE)
+
+    def test_templates_reference_collected_files(self):
+        """Все ссылки на статику в шаблонах есть в манифесте."""
+        response = self.client.get('/about/author/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '/static/img/fav/favicon.')
+
+    def test_unknown_and_other_paths(self):
+        status, _, _ = self.call('/static/missing.css')
+        self.assertEqual(status, '404 Not Found')
+        _, _, body = self.call('/about/')
+        self.assertEqual(body, b'django')
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+
+from core.surrogates import get_purger
+from posts.counters import view_counter
+from posts.models import Comment, Group, Post, User
+
+
+class SurrogateKeyTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='TestUser')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Тестовый пост',
+        )
+        self.purged = get_purger().purged
+        self.purged.clear()
+        self.guest_client = Client()
+
+    def tearDown(self):
+        view_counter.clear()
+
+    def test_pages_are_tagged(self):
+        """Страницы помечены ключами и доступны общему кешу."""
+        pages = {
+            reverse('posts:index'): 'index',
+            reverse('posts:group_list', args=(self.group.slug,)): (
+                f'group-{self.group.pk}'
+            ),
+            reverse('posts:profile', args=(self.user.username,)): (
+                f'author-{self.user.pk}'
+            ),
+            reverse('posts:post_detail', args=(self.post.pk,)): (
+                f'post-{self.post.pk}'
+            ),
+        }
+        for address, key in pages.items():
+            with self.subTest(address=address):
+                for _ in range(2):
+                    response = self.guest_client.get(address)
+                    keys = response['Surrogate-Key'].split()
+                    self.assertIn(key, keys)
+                    self.assertIn(f'post-{self.post.pk}', keys)
+                    self.assertIn('public', response['Cache-Control'])
+                    self.assertIn(
+                        f's-maxage={settings.SURROGATE_MAX_AGE}',
+                        response['Cache-Control'],
+                    )
+
+    def test_logged_in_pages_are_private(self):
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('posts:index'))
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_changes_purge_keys(self):
+        """Изменения постов, комментариев и групп сбрасывают ключи."""
+        Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост',
+        )
+        self.assertTrue(
+            {'index', f'group-{self.group.pk}', f'author-{self.user.pk}'}
+            <= set(self.purged)
+        )
+        self.purged.clear()
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Комментарий',
+        )
+        self.assertEqual(self.purged, [f'post-{self.post.pk}'])
+        self.purged.clear()
+        self.post.group = None
+        self.post.save()
+        self.assertIn(f'group-{self.group.pk}', self.purged)
@@ -0,0 +1,35 @@
+import os
+
+from django.conf import settings
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from core.warmup import warm_up_templates
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+
+@override_settings(TEMPLATES=CACHED_TEMPLATES)
+class WarmUpTests(TestCase):
+    def test_all_templates_compiled(self):
+        """Все шаблоны из templates/ попадают в кеш загрузчика."""
+        expected = sum(
+            name.endswith('.html')
+            for _, _, files in os.walk(settings.TEMPLATES_DIR)
+            for name in files
+        )
+        self.assertEqual(warm_up_templates(), expected)
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIn('posts/index.html', loader.get_template_cache)
@@ -0,0 +1,28 @@
+import os
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+
+def warm_up_templates():
+    """Скомпилировать все шаблоны из каталогов DIRS.
+
+    С кеширующим загрузчиком разобранные шаблоны остаются в памяти,
+    и первый запрос к странице не платит за чтение и разбор файлов.
+    Возвращает число загруженных шаблонов.
+    """
+    count = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in engine.engine.dirs:
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    if not filename.endswith('.html'):
+                        continue
+                    name = os.path.relpath(
+                        os.path.join(root, filename), directory
+                    )
+                    engine.get_template(name.replace(os.sep, '/'))
+                    count += 1
+    return count
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from .models import (ArchivedPost, Comment, FanoutTask, Follow, Group,
+                     Notification, Post, Recommendation)
 
 
 @admin.register(Post)
@@ -12,6 +13,18 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = ('text',)
     list_filter = ('created',)
     empty_value_display = '-пусто-'
+    list_select_related = ('author', 'group',)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """Список групп для ``list_editable`` читается один раз на
+        страницу, а не в каждой строке.
+        """
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'group' and request is not None:
+            if not hasattr(request, 'group_choices'):
+                request.group_choices = list(field.choices)
+            field.choices = request.group_choices
+        return field
 
 
 @admin.register(Group)
@@ -39,3 +52,40 @@ class FollowAdmin(admin.ModelAdmin):
     list_display = ('pk', 'user', 'author',)
     search_fields = ('user',)
     empty_value_display = '-пусто-'
+
+
+@admin.register(Recommendation)
+class RecommendationAdmin(admin.ModelAdmin):
+    """Поля в админке рекомендаций."""
+
+    list_display = ('pk', 'user', 'author', 'score',)
+    search_fields = ('user__username',)
+    empty_value_display = '-пусто-'
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    """Поля в админке уведомлений."""
+
+    list_display = ('pk', 'user', 'post', 'is_read', 'created',)
+    list_filter = ('is_read',)
+    search_fields = ('user__username',)
+    empty_value_display = '-пусто-'
+
+
+@admin.register(FanoutTask)
+class FanoutTaskAdmin(admin.ModelAdmin):
+    """Поля в админке рассылок уведомлений."""
+
+    list_display = ('pk', 'post', 'cursor', 'created',)
+    empty_value_display = '-пусто-'
+
+
+@admin.register(ArchivedPost)
+class ArchivedPostAdmin(admin.ModelAdmin):
+    """Поля в админке архивных постов."""
+
+    list_display = ('pk', 'text', 'created', 'author', 'group',)
+    search_fields = ('text',)
+    list_filter = ('created',)
+    empty_value_display = '-пусто-'
@@ -0,0 +1,130 @@
+import hashlib
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models.deletion import Collector
+from django.utils.functional import cached_property
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+from .notifications import discard_unread, forget_unread
+from .utils import CountProvider, after_cursor, bump_version, data_version
+
+ARCHIVE_KEY = 'archive:version'
+
+
+class ArchiveFeed:
+    """Свежие посты, за которыми идут архивные.
+
+    Для ``Paginator`` ведёт себя как QuerySet: умеет ``count()`` и
+    срезы. Срез внутри свежих постов — один запрос к ``posts_post``,
+    архив читается только для страниц за его пределами. Число
+    архивных постов кешируется до следующего запуска архивации.
+
+    ``counter`` даёт только число постов для навигации: оно может быть
+    закешированным или оценочным. Границу между свежими постами и
+    архивом срезы находят по точным данным, иначе посты на ней
+    пропадали бы или повторялись.
+    """
+
+    ordered = True
+
+    def __init__(self, hot, archive, counter=None):
+        self.hot = hot
+        self.archive = archive
+        self.counter = counter or CountProvider(hot)
+
+    @property
+    def approximate(self):
+        return self.counter.approximate
+
+    @cached_property
+    def hot_count(self):
+        return self.counter.count()
+
+    @cached_property
+    def exact_hot_count(self):
+        return self.hot.count()
+
+    @cached_property
+    def archive_count(self):
+        digest = hashlib.md5(str(self.archive.query).encode()).hexdigest()
+        key = f'archive:count:{data_version(ARCHIVE_KEY)}:{digest}'
+        return cache.get_or_set(
+            key, self.archive.count, settings.VERSIONED_CACHE_TIMEOUT
+        )
+
+    def count(self):
+        return self.hot_count + self.archive_count
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return chain(self.hot, self.archive)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        items = list(self.hot[start:stop])
+        if stop is not None and len(items) == stop - start:
+            return items
+        # Свежие посты кончились внутри среза или до него.
+        hot_total = start + len(items) if items else self.exact_hot_count
+        archive_stop = None if stop is None else stop - hot_total
+        return items + list(
+            self.archive[max(start - hot_total, 0):archive_stop]
+        )
+
+    def after(self, cursor, size):
+        """Следующие ``size`` постов после курсора.
+
+        Архив читается, только если свежих постов не хватило.
+        """
+        posts = list(after_cursor(self.hot, cursor)[:size])
+        if len(posts) < size:
+            posts += after_cursor(self.archive, cursor)[:size - len(posts)]
+        return posts
+
+
+def archive_batch(cutoff, batch_size):
+    """Перенести в архив пачку постов старше ``cutoff``.
+
+    Посты переносятся вместе с комментариями, уведомления о них
+    удаляются. Возвращает число перенесённых постов.
+    """
+    posts = list(
+        Post.objects.filter(created__lt=cutoff)
+        .select_related('author', 'group')
+        .order_by('pk')[:batch_size]
+    )
+    if not posts:
+        return 0
+    with transaction.atomic():
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(
+                id=post.pk, created=post.created, text=post.text,
+                text_html=post.text_html, text_excerpt=post.text_excerpt,
+                author_id=post.author_id, group_id=post.group_id,
+                image=post.image.name, views=post.views,
+            )
+            for post in posts
+        )
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(
+                post_id=comment.post_id, created=comment.created,
+                author_id=comment.author_id, text=comment.text,
+            )
+            for comment in Comment.objects.filter(post__in=posts).iterator()
+        )
+        readers = discard_unread([post.pk for post in posts])
+        # Удаляем уже загруженные посты, чтобы сигналы получили их
+        # вместе с автором и группой и не запрашивали их по одному.
+        collector = Collector(using=router.db_for_write(Post))
+        collector.collect(posts)
+        collector.delete()
+    forget_unread(readers)
+    bump_version(ARCHIVE_KEY)
+    return len(posts)
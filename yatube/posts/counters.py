@@ -0,0 +1,102 @@
+import atexit
+import logging
+import sys
+from collections import Counter, defaultdict
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .models import Post
+from .utils import bump_version, post_page_key
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """Счётчик просмотров постов с отложенной записью.
+
+    Просмотры копятся в памяти процесса и раз в
+    ``VIEW_COUNTER_FLUSH_INTERVAL`` секунд записываются в базу одной
+    транзакцией после ответа на любой запрос (сигнал
+    ``request_finished``) и при остановке процесса. Запись идёт
+    приращением ``views = views + delta``, поэтому несколько процессов
+    не затирают данные друг друга. Если база недоступна, просмотры
+    остаются в памяти до следующей попытки.
+    """
+
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = Lock()
+        self._flushed_at = monotonic()
+
+    def hit(self, post_id):
+        with self._lock:
+            self._pending[post_id] += 1
+
+    def cancel(self, post_id):
+        """Отменить просмотр, например несуществующего поста."""
+        with self._lock:
+            self._pending[post_id] -= 1
+            if self._pending[post_id] <= 0:
+                del self._pending[post_id]
+
+    def clear(self):
+        """Забыть накопленные просмотры, не записывая их."""
+        with self._lock:
+            self._pending.clear()
+
+    def flush_if_due(self):
+        """Записать просмотры, если прошёл интервал сброса."""
+        due = (
+            monotonic() - self._flushed_at
+            >= settings.VIEW_COUNTER_FLUSH_INTERVAL
+        )
+        if due and self._pending:
+            self.flush()
+
+    def pending(self, post_id):
+        """Просмотры поста, ещё не записанные в базу."""
+        return self._pending.get(post_id, 0)
+
+    def flush(self):
+        """Записать накопленные просмотры в базу.
+
+        Возвращает ``False``, если записать не удалось.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = monotonic()
+        if not pending:
+            return True
+        by_delta = defaultdict(list)
+        for post_id, delta in pending.items():
+            by_delta[delta].append(post_id)
+        try:
+            with transaction.atomic():
+                for delta, post_ids in by_delta.items():
+                    Post.objects.filter(pk__in=post_ids).update(
+                        views=F('views') + delta
+                    )
+        except Exception:
+            logger.exception('Не удалось записать просмотры постов')
+            with self._lock:
+                self._pending.update(pending)
+            return False
+        bump_version(*(post_page_key(post_id) for post_id in pending))
+        return True
+
+
+view_counter = ViewCounter()
+
+
+def flush_at_exit():
+    view_counter.flush()
+
+
+# После тестов тестовая база уже удалена, и запись при выходе ушла бы
+# в рабочую базу разработчика.
+if sys.argv[1:2] != ['test'] and 'pytest' not in sys.modules:
+    atexit.register(flush_at_exit)
@@ -0,0 +1,80 @@
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from .models import Group
+
+User = get_user_model()
+
+
+INDEX_FEED_KEY = 'feed:index'
+
+
+def group_feed_key(slug):
+    """Ключ версии ленты группы; слаг может быть не в ASCII."""
+    return f'feed:group:{quote(slug)}'
+
+
+def author_feed_key(username):
+    return f'feed:author:{quote(username)}'
+
+
+class PostFeed(Feed):
+    """Общая часть Atom-лент с постами."""
+
+    feed_type = Atom1Feed
+
+    def item_title(self, item):
+        return str(item)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item.pk,))
+
+    def item_pubdate(self, item):
+        return item.created
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupFeed(PostFeed):
+    """Лента последних постов группы."""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return group.title
+
+    def subtitle(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', args=(group.slug,))
+
+    def items(self, group):
+        return group.posts.select_related('author')[:settings.FEED_ITEMS]
+
+
+class AuthorFeed(PostFeed):
+    """Лента последних постов автора."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Записи {author.get_full_name() or author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=(author.username,))
+
+    def items(self, author):
+        return author.posts.select_related('author')[:settings.FEED_ITEMS]
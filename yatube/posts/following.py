@@ -0,0 +1,73 @@
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import POST_COUNT_KEY, Follow
+
+FOLLOWING_KEY = 'following:{}'
+
+
+class FollowingSet:
+    """Отсортированный массив id авторов, на которых подписан пользователь.
+
+    Хранится в кеше в виде байтов ``array('L')``, проверка вхождения
+    выполняется бинарным поиском.
+    """
+
+    __slots__ = ('ids',)
+
+    def __init__(self, ids=()):
+        self.ids = array('L', sorted(ids))
+
+    @classmethod
+    def frombytes(cls, data):
+        following = cls()
+        following.ids.frombytes(data)
+        return following
+
+    def tobytes(self):
+        return self.ids.tobytes()
+
+    def __contains__(self, author_id):
+        author_id = getattr(author_id, 'pk', author_id)
+        index = bisect_left(self.ids, author_id)
+        return index < len(self.ids) and self.ids[index] == author_id
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def intersection(self, author_ids):
+        """Вернуть множество id из author_ids, на которых есть подписка."""
+        return {author_id for author_id in author_ids if author_id in self}
+
+
+def following_set(user):
+    """Получить подписки пользователя одним обращением к кешу."""
+    if not user.is_authenticated:
+        return FollowingSet()
+    key = FOLLOWING_KEY.format(user.pk)
+    data = cache.get(key)
+    if data is not None:
+        return FollowingSet.frombytes(data)
+    following = FollowingSet(
+        Follow.objects.filter(user=user).values_list('author_id', flat=True)
+    )
+    cache.set(
+        key, following.tobytes(), settings.FOLLOWING_CACHE_TIMEOUT
+    )
+    return following
+
+
+def forget_following(user_id):
+    """Сбросить закешированные подписки и размер ленты подписок после
+    их изменения.
+    """
+    cache.delete_many([
+        FOLLOWING_KEY.format(user_id),
+        POST_COUNT_KEY.format(f'follow:{user_id}'),
+    ])
@@ -0,0 +1,34 @@
+from datetime import timedelta
+from time import sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = 'Перенести старые посты в архив небольшими пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Переносить посты старше этого числа дней.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между пачками в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        archived = 0
+        while True:
+            count = archive_batch(cutoff, options['batch_size'])
+            if not count:
+                break
+            archived += count
+            sleep(options['pause'])
+        self.stdout.write(f'Перенесено в архив постов: {archived}')
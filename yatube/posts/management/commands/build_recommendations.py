@@ -0,0 +1,29 @@
+from time import monotonic
+
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import build_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Пересчитать рекомендации авторов по графу подписок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Сколько рекомендаций хранить для каждого пользователя.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Размер пачки при записи в базу.',
+        )
+
+    def handle(self, *args, **options):
+        started = monotonic()
+        count = build_recommendations(
+            limit=options['limit'], batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано рекомендаций: {count} '
+            f'за {monotonic() - started:.1f} с'
+        ))
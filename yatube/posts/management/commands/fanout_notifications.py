@@ -0,0 +1,32 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+
+from posts.models import FanoutTask
+from posts.notifications import fanout
+
+
+class Command(BaseCommand):
+    help = 'Разослать подписчикам уведомления о новых постах.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Сколько подписчиков обрабатывать за один шаг рассылки.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, проверяя очередь каждые --interval с.',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            sent = fanout(chunk_size=options['chunk_size'])
+            if sent:
+                self.stdout.write(f'Разослано уведомлений: {sent}')
+            if FanoutTask.objects.exists():
+                continue
+            if not options['loop']:
+                break
+            sleep(options['interval'])
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import ArchivedPost, Post
+
+
+class Command(BaseCommand):
+    help = 'Подготовить HTML и начало текста для постов без них.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать все посты, а не только необработанные.',
+        )
+
+    def handle(self, *args, **options):
+        for model in (Post, ArchivedPost):
+            rendered = self.render(model, options['batch_size'],
+                                   options['all'])
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: обработано {rendered}'
+            )
+
+    def render(self, model, batch_size, everything):
+        queryset = model.objects.order_by('pk')
+        if not everything:
+            queryset = queryset.filter(text_html='')
+        rendered = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk).only('pk', 'text')[:batch_size]
+            )
+            if not batch:
+                return rendered
+            for obj in batch:
+                obj.render()
+            model.objects.bulk_update(batch, ('text_html', 'text_excerpt'))
+            rendered += len(batch)
+            last_pk = batch[-1].pk
@@ -1,11 +1,16 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
 
 from core.models import CreatedModel
 
 User = get_user_model()
 
+POST_COUNT_KEY = 'count:posts:{}'
+
 
 class Group(models.Model):
     """Модель группы."""
@@ -24,6 +29,12 @@ class Group(models.Model):
         verbose_name='Описание',
         help_text='Введите описание группы',
     )
+    trending_score = models.FloatField(
+        verbose_name='Популярность',
+        default=0,
+        editable=False,
+        db_index=True,
+    )
 
     class Meta:
         """Метаданные модели группы."""
@@ -36,7 +47,97 @@ class Group(models.Model):
         return self.title
 
 
-class Post(CreatedModel):
+def post_count_key(**filters):
+    """Ключ счётчика постов ленты и признак, что счётчик ведётся.
+
+    Ведомые счётчики есть у общей ленты, у групп и у авторов. Счётчик
+    ленты подписок поправляет рассылка уведомлений, но он живёт
+    недолго. Для прочих фильтров ключа нет.
+    """
+    if not filters:
+        return POST_COUNT_KEY.format('all'), True
+    if len(filters) == 1:
+        (field, value), = filters.items()
+        if field in ('group', 'author'):
+            return POST_COUNT_KEY.format(f'{field}:{value.pk}'), True
+        if field == 'author__following__user':
+            return POST_COUNT_KEY.format(f'follow:{value.pk}'), False
+    return None, False
+
+
+class PostManager(models.Manager):
+    """Менеджер постов с доступом к архиву."""
+
+    def with_archive(self, **filters):
+        """Посты по фильтру вместе с перенесёнными в архив.
+
+        Архив читается, только когда срез выходит за свежие посты.
+        """
+        from .archive import ArchiveFeed
+        from .utils import CountProvider
+
+        ordering = ('-created', '-pk')
+        hot = self.filter(**filters).order_by(*ordering)
+        return ArchiveFeed(
+            hot.select_related('author', 'group'),
+            ArchivedPost.objects.filter(**filters)
+            .select_related('author', 'group').order_by(*ordering),
+            CountProvider(hot, *post_count_key(**filters)),
+        )
+
+
+def render_text(text):
+    """HTML текста поста: экранирование и переносы строк."""
+    return str(linebreaksbr(text, autoescape=True))
+
+
+def make_excerpt(text):
+    """Начало текста поста для заголовков страниц."""
+    return Truncator(text).chars(settings.POST_EXCERPT_LENGTH)
+
+
+class RenderedTextModel(models.Model):
+    """Модель с текстом, HTML которого готовится при сохранении.
+
+    Шаблоны выводят ``body_html`` и ``excerpt``. Для строк, ещё не
+    обработанных командой ``render_post_texts``, они считаются на лету.
+    """
+
+    text_html = models.TextField(
+        verbose_name='HTML текста', blank=True, editable=False,
+    )
+    text_excerpt = models.CharField(
+        verbose_name='Начало текста',
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def body_html(self):
+        return mark_safe(self.text_html or render_text(self.text))
+
+    @property
+    def excerpt(self):
+        return self.text_excerpt or make_excerpt(self.text)
+
+    def render(self):
+        self.text_html = render_text(self.text)
+        self.text_excerpt = make_excerpt(self.text)
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None:
+            self.render()
+        elif 'text' in update_fields:
+            self.render()
+            update_fields = {*update_fields, 'text_html', 'text_excerpt'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class Post(RenderedTextModel, CreatedModel):
     """Модель поста."""
 
     text = models.TextField(
@@ -63,6 +164,19 @@ class Post(CreatedModel):
         upload_to='posts/',
         blank=True,
     )
+    trending_score = models.FloatField(
+        verbose_name='Популярность',
+        default=0,
+        editable=False,
+        db_index=True,
+    )
+    views = models.PositiveIntegerField(
+        verbose_name='Просмотры',
+        default=0,
+        editable=False,
+    )
+
+    objects = PostManager()
 
     class Meta:
         """Метаданные модели группы."""
@@ -134,3 +248,179 @@ class Follow(CreatedModel):
                 name='unique_follow'
             )
         ]
+
+
+class Recommendation(models.Model):
+    """Рекомендация автора для подписки.
+
+    Заполняется командой ``build_recommendations``.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Пользователь',
+        related_name='recommendations',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Рекомендуемый автор',
+        related_name='recommended_to',
+    )
+    score = models.FloatField(verbose_name='Оценка')
+
+    class Meta:
+        """Метаданные модели рекомендации."""
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        ordering = ('-score',)
+        indexes = [
+            models.Index(
+                fields=['user', '-score'],
+                name='recommendation_user_score',
+            ),
+        ]
+
+
+class Notification(CreatedModel):
+    """Уведомление подписчика о новом посте автора."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Получатель',
+        related_name='notifications',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='notifications',
+    )
+    is_read = models.BooleanField(verbose_name='Прочитано', default=False)
+
+    class Meta:
+        """Метаданные модели уведомления."""
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['user', 'is_read'],
+                name='notification_user_unread',
+            ),
+        ]
+
+
+class UnreadCounter(models.Model):
+    """Число непрочитанных уведомлений пользователя."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Пользователь',
+        related_name='unread_counter',
+    )
+    unread = models.PositiveIntegerField(
+        verbose_name='Непрочитанных', default=0,
+    )
+
+    class Meta:
+        """Метаданные модели счётчика."""
+        verbose_name = 'Счётчик уведомлений'
+        verbose_name_plural = 'Счётчики уведомлений'
+
+
+class FanoutTask(CreatedModel):
+    """Рассылка уведомлений о посте, которую ещё не закончили.
+
+    ``cursor`` хранит pk последней обработанной подписки, поэтому
+    прерванная рассылка продолжается с того же места.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='fanout_task',
+    )
+    cursor = models.PositiveIntegerField(verbose_name='Курсор', default=0)
+
+    class Meta:
+        """Метаданные модели рассылки."""
+        verbose_name = 'Рассылка уведомлений'
+        verbose_name_plural = 'Рассылки уведомлений'
+        ordering = ('created',)
+
+
+class ArchivedPost(RenderedTextModel):
+    """Старый пост, перенесённый командой ``archive_posts``.
+
+    Сохраняет ``id`` исходного поста, поэтому ссылки на пост не
+    меняются.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    created = models.DateTimeField('Дата создания', db_index=True)
+    text = models.TextField(verbose_name='Текст')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор',
+        related_name='archived_posts',
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        verbose_name='Группа',
+        related_name='archived_posts',
+    )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True,
+    )
+    views = models.PositiveIntegerField(verbose_name='Просмотры', default=0)
+
+    class Meta:
+        """Метаданные модели архивного поста."""
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+        ordering = ('-created',)
+
+    def __str__(self):
+        """Вернуть содержимое поста."""
+        return self.text[:settings.NUMBER_OF_CHARACTERS_IN_TEXT_OF_POST]
+
+
+class ArchivedComment(models.Model):
+    """Комментарий к архивному посту."""
+
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='comments',
+    )
+    created = models.DateTimeField('Дата создания')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Комментатор',
+        related_name='archived_comments',
+    )
+    text = models.TextField(verbose_name='Комментарий')
+
+    class Meta:
+        """Метаданные модели архивного комментария."""
+        verbose_name = 'Архивный комментарий'
+        verbose_name_plural = 'Архивные комментарии'
+        ordering = ('-created',)
+
+    def __str__(self):
+        """Вернуть текст комментария."""
+        return self.text[:settings.NUMBER_OF_CHARACTERS_IN_TEXT_OF_POST]
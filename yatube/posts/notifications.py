@@ -0,0 +1,127 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import (POST_COUNT_KEY, FanoutTask, Follow, Notification,
+                     UnreadCounter)
+from .utils import adjust_counts
+
+UNREAD_KEY = 'unread:{}'
+
+
+def forget_unread(user_ids):
+    cache.delete_many([UNREAD_KEY.format(pk) for pk in user_ids])
+
+
+def fanout_chunk(task, chunk_size=None):
+    """Разослать уведомления следующей пачке подписчиков.
+
+    Пачка забирается условным UPDATE курсора, поэтому несколько
+    обработчиков не разошлют одну пачку дважды. Возвращает число
+    получателей или ``None``, если пачку уже забрал другой обработчик.
+    """
+    chunk_size = chunk_size or settings.NOTIFICATIONS_FANOUT_CHUNK
+    follows = list(
+        Follow.objects.filter(
+            author_id=task.post.author_id, pk__gt=task.cursor,
+        ).order_by('pk').values_list('pk', 'user_id')[:chunk_size]
+    )
+    if not follows:
+        task.delete()
+        return 0
+    cursor = follows[-1][0]
+    user_ids = [user_id for _, user_id in follows]
+    with transaction.atomic():
+        claimed = FanoutTask.objects.filter(
+            pk=task.pk, cursor=task.cursor,
+        ).update(cursor=cursor)
+        if not claimed:
+            return None
+        task.cursor = cursor
+        Notification.objects.bulk_create(
+            Notification(user_id=user_id, post_id=task.post_id)
+            for user_id in user_ids
+        )
+        UnreadCounter.objects.bulk_create(
+            (UnreadCounter(user_id=user_id) for user_id in user_ids),
+            ignore_conflicts=True,
+        )
+        UnreadCounter.objects.filter(user_id__in=user_ids).update(
+            unread=F('unread') + 1
+        )
+    forget_unread(user_ids)
+    adjust_counts(
+        [POST_COUNT_KEY.format(f'follow:{pk}') for pk in user_ids], 1
+    )
+    if len(follows) < chunk_size:
+        task.delete()
+    return len(user_ids)
+
+
+def fanout(limit=None, chunk_size=None):
+    """Обработать по одной пачке из каждой ожидающей рассылки.
+
+    Очередь обходится по кругу, чтобы автор с большим числом
+    подписчиков не задерживал уведомления о постах других авторов.
+    Возвращает число разосланных уведомлений.
+    """
+    tasks = FanoutTask.objects.select_related('post')[:limit]
+    sent = 0
+    for task in tasks:
+        sent += fanout_chunk(task, chunk_size) or 0
+    return sent
+
+
+def unread_count(user):
+    """Число непрочитанных уведомлений, закешированное на пользователя."""
+    key = UNREAD_KEY.format(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = UnreadCounter.objects.filter(user=user).values_list(
+            'unread', flat=True
+        ).first() or 0
+        cache.set(key, count, settings.UNREAD_CACHE_TIMEOUT)
+    return count
+
+
+def mark_read(user, notification_ids):
+    """Отметить прочитанными показанные пользователю уведомления.
+
+    Уведомления, разосланные после выборки страницы, пользователь не
+    видел, и они остаются непрочитанными.
+    """
+    with transaction.atomic():
+        read = user.notifications.filter(
+            pk__in=notification_ids, is_read=False,
+        ).update(is_read=True)
+        if read:
+            UnreadCounter.objects.filter(user=user).update(
+                unread=Greatest(F('unread') - read, 0)
+            )
+    forget_unread([user.pk])
+
+
+def discard_unread(post_ids):
+    """Вычесть из счётчиков непрочитанные уведомления о постах, которые
+    сейчас будут удалены.
+
+    Вызывается в транзакции удаления и возвращает получателей, чьи
+    закешированные счётчики нужно сбросить после неё через
+    ``forget_unread``.
+    """
+    unread = (
+        Notification.objects.filter(post_id__in=post_ids, is_read=False)
+        .order_by().values('user_id').annotate(count=Count('pk'))
+    )
+    users_by_count = defaultdict(list)
+    for row in unread:
+        users_by_count[row['count']].append(row['user_id'])
+    for count, user_ids in users_by_count.items():
+        UnreadCounter.objects.filter(user_id__in=user_ids).update(
+            unread=Greatest(F('unread') - count, 0)
+        )
+    return [pk for user_ids in users_by_count.values() for pk in user_ids]
@@ -0,0 +1,146 @@
+import heapq
+from array import array
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+
+from .following import following_set
+from .models import Follow, Recommendation
+
+# Вклад автора, на которого подписан тот, на кого подписан пользователь.
+FRIEND_WEIGHT = 1.0
+# Вклад авторов, которых читают вместе с авторами пользователя.
+CO_FOLLOW_WEIGHT = 2.0
+# Сколько соседей вершины учитывать: ограничивает работу на «звёздах».
+MAX_FANOUT = 200
+# Сколько похожих авторов запоминать для каждого автора.
+RELATED_LIMIT = 50
+
+
+def _adjacency(pairs):
+    """Собрать массивы смежности из пар, отсортированных по источнику.
+
+    Возвращает словарь ``{источник: (начало, конец)}`` и плоский массив
+    соседей, как в формате CSR.
+    """
+    index = {}
+    targets = array('L')
+    current, start = None, 0
+    for source, target in pairs:
+        if source != current:
+            if current is not None:
+                index[current] = (start, len(targets))
+            current, start = source, len(targets)
+        targets.append(target)
+    if current is not None:
+        index[current] = (start, len(targets))
+    return index, targets
+
+
+class FollowGraph:
+    """Граф подписок в виде двух массивов смежности."""
+
+    def __init__(self, edges_by_user, edges_by_author):
+        self._following, self._following_ids = _adjacency(edges_by_user)
+        self._followers, self._follower_ids = _adjacency(edges_by_author)
+        self._related = {}
+
+    @classmethod
+    def load(cls, chunk_size=10000):
+        edges = Follow.objects.values_list('user_id', 'author_id')
+        return cls(
+            edges.order_by('user_id', 'author_id').iterator(chunk_size),
+            (
+                (author_id, user_id) for user_id, author_id
+                in edges.order_by('author_id', 'user_id').iterator(chunk_size)
+            ),
+        )
+
+    def users(self):
+        return self._following.keys()
+
+    def following(self, user_id):
+        start, end = self._following.get(user_id, (0, 0))
+        return self._following_ids[start:end]
+
+    def followers(self, author_id):
+        start, end = self._followers.get(author_id, (0, 0))
+        return self._follower_ids[start:end]
+
+    def related(self, author_id):
+        """Авторы, которых чаще всего читают вместе с данным."""
+        related = self._related.get(author_id)
+        if related is None:
+            followers = self.followers(author_id)[:MAX_FANOUT]
+            counts = Counter()
+            for follower_id in followers:
+                counts.update(self.following(follower_id)[:MAX_FANOUT])
+            counts.pop(author_id, None)
+            related = [
+                (candidate, CO_FOLLOW_WEIGHT * count / len(followers))
+                for candidate, count in counts.most_common(RELATED_LIMIT)
+            ]
+            self._related[author_id] = related
+        return related
+
+    def recommend(self, user_id, limit):
+        """Лучшие ``limit`` авторов для пользователя и их оценки."""
+        following = self.following(user_id)
+        scores = defaultdict(float)
+        for author_id in following:
+            for candidate in self.following(author_id)[:MAX_FANOUT]:
+                scores[candidate] += FRIEND_WEIGHT
+            for candidate, weight in self.related(author_id):
+                scores[candidate] += weight
+        for author_id in following:
+            scores.pop(author_id, None)
+        scores.pop(user_id, None)
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+
+def build_recommendations(limit=None, batch_size=1000):
+    """Пересчитать таблицу рекомендаций по всему графу подписок.
+
+    Рекомендации сначала считаются в компактные массивы, а затем
+    записываются одной транзакцией, чтобы не держать блокировку базы
+    во время расчёта. Возвращает число записанных рекомендаций.
+    """
+    limit = limit or settings.RECOMMENDATIONS_PER_USER
+    graph = FollowGraph.load()
+    user_ids, author_ids, scores = array('L'), array('L'), array('d')
+    for user_id in graph.users():
+        for author_id, score in graph.recommend(user_id, limit):
+            user_ids.append(user_id)
+            author_ids.append(author_id)
+            scores.append(score)
+    with transaction.atomic():
+        Recommendation.objects.all().delete()
+        for start in range(0, len(user_ids), batch_size):
+            end = start + batch_size
+            Recommendation.objects.bulk_create(
+                Recommendation(user_id=user_id, author_id=author_id,
+                               score=score)
+                for user_id, author_id, score in zip(
+                    user_ids[start:end],
+                    author_ids[start:end],
+                    scores[start:end],
+                )
+            )
+    return len(user_ids)
+
+
+def recommendations_for(user):
+    """Рекомендации для показа пользователю одним запросом по индексу."""
+    if not user.is_authenticated:
+        return []
+    following = following_set(user)
+    return [
+        recommendation for recommendation in (
+            user.recommendations
+            .select_related('author')
+            [:settings.RECOMMENDATIONS_SHOWN]
+        )
+        if recommendation.author_id not in following
+    ]
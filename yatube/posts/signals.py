@@ -0,0 +1,156 @@
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.surrogates import purge
+
+from . import trending
+from .counters import view_counter
+from .feeds import INDEX_FEED_KEY, author_feed_key, group_feed_key
+from .following import forget_following
+from .models import (POST_COUNT_KEY, Comment, FanoutTask, Follow, Group, Post,
+                     User)
+from .sitemaps import GROUPS_KEY, POSTS_SHARD_KEY, shard_of
+from .utils import (adjust_counts, bump_version, post_page_key,
+                    post_surrogate_keys)
+
+
+@receiver(request_finished)
+def flush_view_counts(sender, **kwargs):
+    """Записывать просмотры после ответа, а не внутри страницы."""
+    view_counter.flush_if_due()
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def refresh_following(sender, instance, **kwargs):
+    """Подписки меняют не только представления, поэтому кеш сбрасывается
+    на уровне модели.
+    """
+    forget_following(instance.user_id)
+
+
+@receiver(pre_save, sender=Post)
+def score_new_post(sender, instance, **kwargs):
+    """Начальная популярность поста без отдельного UPDATE."""
+    if instance._state.adding and not instance.trending_score:
+        instance.trending_score = trending.event_score(trending.POST_WEIGHT)
+
+
+@receiver(post_save, sender=Post)
+def bump_group_on_post(sender, instance, created, **kwargs):
+    if created:
+        trending.bump(Group, instance.group_id, trending.POST_WEIGHT)
+
+
+@receiver(post_save, sender=Post)
+def enqueue_fanout(sender, instance, created, **kwargs):
+    """Поставить в очередь уведомления подписчиков о новом посте."""
+    if created:
+        FanoutTask.objects.create(post=instance)
+
+
+@receiver(post_save, sender=Comment)
+def bump_on_comment(sender, instance, created, **kwargs):
+    if created:
+        trending.bump(Post, instance.post_id, trending.COMMENT_WEIGHT)
+        trending.bump(
+            Group, instance.post.group_id, trending.COMMENT_WEIGHT
+        )
+
+
+def _author_username(post):
+    if Post.author.is_cached(post):
+        return post.author.username
+    return User.objects.filter(pk=post.author_id).values_list(
+        'username', flat=True
+    ).first()
+
+
+def _group_slugs(post, group_ids):
+    """Слаги групп одним запросом; загруженную группу не запрашивать."""
+    if group_ids == {post.group_id} and Post.group.is_cached(post):
+        return [post.group.slug]
+    return Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def refresh_post_listings(sender, instance, **kwargs):
+    """Пересобрать ленты и часть карты сайта с изменённым постом.
+
+    Пост, перенесённый в другую группу, пропадает и из ленты прежней.
+    """
+    keys = [
+        INDEX_FEED_KEY,
+        post_page_key(instance.pk),
+        POSTS_SHARD_KEY.format(shard_of(instance.pk)),
+    ]
+    username = _author_username(instance)
+    if username is not None:
+        keys.append(author_feed_key(username))
+    previous_group_id = getattr(instance, '_saved_group_id', None)
+    group_ids = {instance.group_id, previous_group_id} - {None}
+    if group_ids:
+        keys += map(group_feed_key, _group_slugs(instance, group_ids))
+    bump_version(*keys)
+    surrogate_keys = post_surrogate_keys(instance)
+    if previous_group_id and previous_group_id != instance.group_id:
+        surrogate_keys.append(f'group-{previous_group_id}')
+    purge(*surrogate_keys)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def refresh_post_page(sender, instance, **kwargs):
+    """Пересобрать страницу поста с изменёнными комментариями."""
+    bump_version(post_page_key(instance.post_id))
+    purge(f'post-{instance.post_id}')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def refresh_group_listings(sender, instance, **kwargs):
+    bump_version(GROUPS_KEY, INDEX_FEED_KEY, group_feed_key(instance.slug))
+    purge(f'group-{instance.pk}')
+
+
+def _group_count_keys(group_id):
+    if group_id is None:
+        return []
+    return [POST_COUNT_KEY.format(f'group:{group_id}')]
+
+
+def _count_keys(post):
+    return [
+        POST_COUNT_KEY.format('all'),
+        POST_COUNT_KEY.format(f'author:{post.author_id}'),
+        *_group_count_keys(post.group_id),
+    ]
+
+
+@receiver(pre_save, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._saved_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    """Поправить ведомые счётчики постов лент."""
+    if created:
+        adjust_counts(_count_keys(instance), 1)
+        return
+    previous = getattr(instance, '_saved_group_id', instance.group_id)
+    if previous != instance.group_id:
+        adjust_counts(_group_count_keys(previous), -1)
+        adjust_counts(_group_count_keys(instance.group_id), 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    adjust_counts(_count_keys(instance), -1)
@@ -0,0 +1,115 @@
+from itertools import chain
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import ExpressionWrapper, F, IntegerField
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+
+from .models import ArchivedPost, Group, Post
+from .utils import versioned
+
+POSTS_SHARD_KEY = 'sitemap:posts:{}'
+GROUPS_KEY = 'sitemap:groups'
+CONTENT_TYPE = 'application/xml'
+URLSET_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+
+
+def shard_of(post_id):
+    """Номер части карты сайта, в которую попадает пост."""
+    return (post_id - 1) // settings.SITEMAP_SHARD_SIZE
+
+
+def _url(request, location, lastmod=None):
+    line = f'<url><loc>{escape(request.build_absolute_uri(location))}</loc>'
+    if lastmod is not None:
+        line += f'<lastmod>{lastmod:%Y-%m-%d}</lastmod>'
+    return line + '</url>\n'
+
+
+def _urlset(lines):
+    """Ответ с картой сайта из строк ``lines``.
+
+    Тело собирается в памяти целиком, потому что ``versioned`` кеширует
+    его одной записью; ``iterator()`` лишь не держит в памяти объекты
+    моделей.
+    """
+    return HttpResponse(
+        chain([URLSET_OPEN], lines, ['</urlset>\n']),
+        content_type=CONTENT_TYPE,
+    )
+
+
+def post_shards():
+    """Номера непустых частей карты сайта по возрастанию."""
+    shard = ExpressionWrapper(
+        (F('pk') - 1) / settings.SITEMAP_SHARD_SIZE,
+        output_field=IntegerField(),
+    )
+    return sorted(set(chain.from_iterable(
+        model.objects.annotate(shard=shard).order_by()
+        .values_list('shard', flat=True).distinct()
+        for model in (ArchivedPost, Post)
+    )))
+
+
+def sitemap_index(request):
+    """Оглавление карты сайта: группы и непустые части со ссылками
+    на посты.
+    """
+    shards = post_shards()
+    locations = [reverse('posts:sitemap_groups')] + [
+        reverse('posts:sitemap_posts', args=(shard,)) for shard in shards
+    ]
+    content = ''.join(
+        '<sitemap><loc>'
+        f'{escape(request.build_absolute_uri(location))}'
+        '</loc></sitemap>\n'
+        for location in locations
+    )
+    return HttpResponse(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<sitemapindex '
+        'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        f'{content}</sitemapindex>\n',
+        content_type=CONTENT_TYPE,
+    )
+
+
+@versioned(lambda: GROUPS_KEY)
+def sitemap_groups(request):
+    """Карта сайта со страницами групп."""
+    slugs = Group.objects.values_list('slug', flat=True).iterator()
+    lines = (
+        _url(request, reverse('posts:group_list', args=(slug,)))
+        for slug in slugs
+    )
+    return _urlset(lines)
+
+
+@versioned(lambda shard: POSTS_SHARD_KEY.format(shard))
+def sitemap_posts(request, shard):
+    """Часть карты сайта с постами из диапазона ``SITEMAP_SHARD_SIZE``
+    идентификаторов.
+
+    Часть пересобирается, только когда меняется один из её постов.
+    """
+    size = settings.SITEMAP_SHARD_SIZE
+    querysets = [
+        model.objects.filter(
+            pk__gt=shard * size, pk__lte=(shard + 1) * size,
+        ).order_by('pk').values_list('pk', 'created')
+        for model in (ArchivedPost, Post)
+    ]
+    if not any(queryset.exists() for queryset in querysets):
+        raise Http404('Такой части карты сайта нет.')
+    lines = (
+        _url(request, reverse('posts:post_detail', args=(pk,)), created)
+        for pk, created in chain.from_iterable(
+            queryset.iterator() for queryset in querysets
+        )
+    )
+    return _urlset(lines)
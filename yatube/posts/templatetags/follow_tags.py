@@ -0,0 +1,26 @@
+from django import template
+
+from posts.following import following_set
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def following_authors(context):
+    """Подписки текущего пользователя.
+
+    Использование: ``{% following_authors as following %}``, затем
+    ``{% if post.author_id in following %}`` для любого числа авторов.
+    """
+    request = context.get('request')
+    if request is None:
+        return following_set(context['user'])
+    if not hasattr(request, '_following_set'):
+        request._following_set = following_set(request.user)
+    return request._following_set
+
+
+@register.simple_tag(takes_context=True)
+def is_following(context, author):
+    """Проверить подписку текущего пользователя на автора."""
+    return author in following_authors(context)
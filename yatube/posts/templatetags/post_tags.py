@@ -0,0 +1,25 @@
+from django import template
+
+from posts.counters import view_counter
+from posts.forms import CommentForm
+from posts.thumbnails import post_thumbnail
+
+register = template.Library()
+
+
+@register.simple_tag
+def comment_form():
+    """Пустая форма комментария для блока, отрендеренного отдельно."""
+    return CommentForm()
+
+
+@register.simple_tag
+def post_views(post_id, stored_views):
+    """Просмотры поста вместе с ещё не записанными в базу."""
+    return stored_views + view_counter.pending(post_id)
+
+
+@register.simple_tag(name='post_thumbnail')
+def post_thumbnail_tag(post):
+    """Миниатюра поста; страницы подгружают их заранее пачкой."""
+    return post_thumbnail(post) if post.image else None
@@ -0,0 +1,11 @@
+from django import template
+
+from posts.recommendations import recommendations_for
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def user_recommendations(context):
+    """Рекомендации авторов для текущего пользователя."""
+    return recommendations_for(context['request'].user)
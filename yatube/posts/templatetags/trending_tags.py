@@ -0,0 +1,11 @@
+from django import template
+
+from posts.trending import trending_groups
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/trending.html')
+def trending_sidebar():
+    """Блок популярных групп для боковой колонки."""
+    return {'trending_groups': trending_groups()}
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.counters import view_counter
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post, User
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.posts = Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number}')
+            for number in range(15)
+        )
+        self.posts = list(Post.objects.order_by('pk'))
+        old = [post.pk for post in self.posts[:8]]
+        Post.objects.filter(pk__in=old).update(
+            created=timezone.now() - timedelta(days=400)
+        )
+        self.old_post = self.posts[0]
+        Comment.objects.create(
+            post=self.old_post, author=self.user, text='Старый комментарий',
+        )
+
+    def tearDown(self):
+        view_counter.clear()
+
+    def archive(self):
+        out = StringIO()
+        call_command('archive_posts', batch_size=3, pause=0, stdout=out)
+        return out.getvalue()
+
+    def test_command_moves_old_posts(self):
+        """Старые посты и их комментарии переезжают в архив пачками."""
+        self.assertIn('8', self.archive())
+        self.assertEqual(Post.objects.count(), 7)
+        self.assertEqual(ArchivedPost.objects.count(), 8)
+        self.assertTrue(
+            ArchivedComment.objects.filter(post_id=self.old_post.pk).exists()
+        )
+        self.assertFalse(Comment.objects.exists())
+
+    def test_pagination_continues_into_archive(self):
+        """Лента дочитывается из архива после свежих постов."""
+        self.archive()
+        address = reverse('posts:index')
+        first = self.guest_client.get(address).context['page_obj']
+        self.assertEqual(first.paginator.count, 15)
+        self.assertEqual(len(first), 10)
+        cache.clear()
+        second = self.guest_client.get(address + '?page=2')
+        self.assertEqual(
+            [post.pk for post in second.context['page_obj']],
+            [post.pk for post in reversed(self.posts[:5])],
+        )
+
+    def test_hot_pages_do_not_read_archive(self):
+        self.archive()
+        feed = Post.objects.with_archive()
+        feed.count()
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(feed[:7])), 7)
+        with self.assertNumQueries(2):
+            self.assertEqual(len(feed[5:10]), 5)
+
+    def test_stale_count_does_not_lose_posts(self):
+        """Устаревшее число свежих постов не сдвигает границу архива."""
+        self.archive()
+        expected = [post.pk for post in reversed(self.posts)]
+        for stale in (3, 12):
+            with self.subTest(stale=stale):
+                feed = Post.objects.with_archive()
+                feed.hot_count = stale
+                pages = [feed[start:start + 4] for start in range(0, 16, 4)]
+                self.assertEqual(
+                    [post.pk for page in pages for post in page], expected
+                )
+
+    def test_archived_post_detail(self):
+        """Архивный пост открывается по прежнему адресу без формы
+        комментария.
+        """
+        self.archive()
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(
+            reverse('posts:post_detail', args=(self.old_post.pk,))
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['archived'])
+        self.assertContains(response, 'Старый комментарий')
+        self.assertNotContains(response, 'Добавить комментарий')
@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.db.utils import OperationalError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.counters import ViewCounter, view_counter
+from posts.models import Post, User
+
+
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+        cls.other_post = Post.objects.create(
+            author=cls.user, text='Другой пост'
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        view_counter.flush()
+
+    def tearDown(self):
+        view_counter.clear()
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=3600)
+    def test_hits_are_buffered(self):
+        """Просмотры копятся в памяти и учитываются на странице."""
+        address = reverse('posts:post_detail', args={self.post.pk})
+        self.guest_client.get(address)
+        response = self.guest_client.get(address)
+        self.assertEqual(response.context['views'], 2)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+        view_counter.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=0)
+    def test_flush_adds_deltas(self):
+        """Сброс прибавляет накопленное к значению в базе, не затирая
+        записи других процессов.
+        """
+        counter = ViewCounter()
+        Post.objects.filter(pk=self.post.pk).update(views=5)
+        for _ in range(3):
+            counter.hit(self.post.pk)
+        counter.hit(self.other_post.pk)
+        counter.hit(self.other_post.pk)
+        counter.flush_if_due()
+        self.post.refresh_from_db()
+        self.other_post.refresh_from_db()
+        self.assertEqual(self.post.views, 8)
+        self.assertEqual(self.other_post.views, 2)
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=0)
+    def test_flush_after_any_request(self):
+        """Просмотры пишутся после ответа на любую страницу."""
+        views = Post.objects.get(pk=self.post.pk).views
+        view_counter.hit(self.post.pk)
+        self.guest_client.get(reverse('posts:index'))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, views + 1)
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=0)
+    def test_failed_flush_keeps_hits(self):
+        """Ошибка базы не роняет страницу, просмотры не теряются."""
+        address = reverse('posts:post_detail', args={self.post.pk})
+        views = Post.objects.get(pk=self.post.pk).views
+        with mock.patch(
+            'posts.counters.transaction.atomic',
+            side_effect=OperationalError('database is locked'),
+        ), self.assertLogs('posts.counters', 'ERROR'):
+            response = self.guest_client.get(address)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(view_counter.pending(self.post.pk), 1)
+        view_counter.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, views + 1)
+
+    def test_missing_post_is_not_counted(self):
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args={10 ** 6})
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(view_counter.pending(10 ** 6), 0)
@@ -0,0 +1,126 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import FanoutTask, Group, Post, User, post_count_key
+from posts.notifications import fanout
+from posts.utils import CountProvider, estimated_rows
+
+
+class CountProviderTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+        for number in range(3):
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {number}'
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def group_count(self, group):
+        return CountProvider(
+            group.posts.all(), *post_count_key(group=group)
+        ).count()
+
+    def test_maintained_counter_follows_changes(self):
+        """Ведомый счётчик меняется сигналами без повторного COUNT(*)."""
+        self.assertEqual(self.group_count(self.group), 3)
+        post = Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост'
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.group_count(self.group), 4)
+        self.assertEqual(self.group_count(self.other_group), 0)
+        post.group = self.other_group
+        post.save()
+        post.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.group_count(self.group), 3)
+            self.assertEqual(self.group_count(self.other_group), 0)
+
+    def test_maintained_counter_is_not_overwritten(self):
+        """COUNT(*) не затирает счётчик, записанный и поправленный, пока
+        он выполнялся.
+        """
+        key, maintained = post_count_key(group=self.group)
+        queryset = self.group.posts.all()
+        count = queryset.count
+
+        def count_then_adjust():
+            result = count()
+            cache.set(key, result + 1)
+            return result
+
+        with mock.patch.object(queryset, 'count', count_then_adjust):
+            provider = CountProvider(queryset, key, maintained)
+            self.assertEqual(provider.count(), 4)
+        self.assertEqual(cache.get(key), 4)
+
+    def test_unmaintained_count_is_cached(self):
+        queryset = Post.objects.filter(text__startswith='Пост')
+        self.assertEqual(CountProvider(queryset).count(), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(CountProvider(queryset).count(), 3)
+
+    def test_follow_feed_count(self):
+        """Размер ленты подписок сбрасывает подписка, а новые посты
+        добавляет рассылка уведомлений.
+        """
+        FanoutTask.objects.all().delete()
+        reader = User.objects.create_user(username='Reader')
+        client = Client()
+        client.force_login(reader)
+        address = reverse('posts:follow_index')
+        self.assertEqual(
+            client.get(address).context['page_obj'].paginator.count, 0
+        )
+        client.get(reverse('posts:profile_follow', args=(self.user,)))
+        self.assertEqual(
+            client.get(address).context['page_obj'].paginator.count, 3
+        )
+        Post.objects.create(author=self.user, text='Новый пост')
+        fanout()
+        feed = Post.objects.with_archive(author__following__user=reader)
+        with self.assertNumQueries(0):
+            self.assertEqual(feed.hot_count, 4)
+
+    @override_settings(COUNT_ESTIMATE_THRESHOLD=1, POSTS_PER_PAGE=2)
+    def test_large_table_count_is_estimated(self):
+        """Для большой таблицы берётся оценка, и шаблон о ней знает."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number}')
+            for number in range(20)
+        )
+        response = Client().get(reverse('posts:index'))
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.count_is_approximate)
+        self.assertEqual(page_obj.paginator.count, 3)
+        self.assertContains(response, 'Число страниц указано приблизительно')
+
+    def test_postgres_estimate(self):
+        """reltuples приходит числом с плавающей точкой, -1 — нет оценки."""
+        for reltuples, expected in ((1234.0, 1234), (-1.0, None)):
+            with self.subTest(reltuples=reltuples):
+                fake = mock.MagicMock(vendor='postgresql')
+                cursor = fake.cursor.return_value.__enter__.return_value
+                cursor.fetchone.return_value = (reltuples,)
+                with mock.patch('posts.utils.connections', {'default': fake}):
+                    self.assertEqual(estimated_rows(Post), expected)
@@ -0,0 +1,151 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Тестовый пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_list_posts(self):
+        """Atom-ленты группы и автора содержат их посты."""
+        for address in (
+            reverse('posts:group_feed', args=(self.group.slug,)),
+            reverse('posts:author_feed', args=(self.user.username,)),
+        ):
+            with self.subTest(address=address):
+                response = self.guest_client.get(address)
+                self.assertEqual(
+                    response['Content-Type'],
+                    'application/atom+xml; charset=utf-8',
+                )
+                self.assertContains(response, 'Тестовый пост')
+                self.assertTrue(response.has_header('ETag'))
+
+    def test_feed_is_served_from_cache_until_post_changes(self):
+        """Лента берётся из кеша, 304 по ETag, и обновляется после
+        изменения поста.
+        """
+        address = reverse('posts:group_feed', args=(self.group.slug,))
+        etag = self.guest_client.get(address)['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(address)
+        self.assertContains(response, 'Тестовый пост')
+        response = self.guest_client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(
+            author=self.user, group=self.group, text='Свежий пост',
+        )
+        response = self.guest_client.get(address, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Свежий пост')
+
+    def test_unknown_feed(self):
+        response = self.guest_client.get(
+            reverse('posts:group_feed', args=('no-such-group',))
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(SITEMAP_SHARD_SIZE=2)
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Пост {number}')
+            for number in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_index_lists_shards(self):
+        """Оглавление ссылается на группы и на все части с постами."""
+        response = self.guest_client.get(reverse('posts:sitemap'))
+        self.assertContains(response, 'sitemap-groups.xml')
+        shards = range((self.posts[-1].pk - 1) // 2 + 1)
+        for shard in shards:
+            self.assertContains(
+                response, reverse('posts:sitemap_posts', args=(shard,))
+            )
+
+    def test_shard_is_rebuilt_only_when_it_changes(self):
+        """Изменение поста сбрасывает только его часть карты сайта."""
+        post = self.posts[0]
+        shard = (post.pk - 1) // 2
+        other_shard = (self.posts[-1].pk - 1) // 2
+        own = reverse('posts:sitemap_posts', args=(shard,))
+        other = reverse('posts:sitemap_posts', args=(other_shard,))
+        response = self.guest_client.get(own)
+        self.assertContains(
+            response, reverse('posts:post_detail', args=(post.pk,))
+        )
+        self.guest_client.get(other)
+        post.text = 'Изменённый пост'
+        post.save()
+        with self.assertNumQueries(0):
+            self.guest_client.get(other)
+        with self.assertNumQueries(4):
+            self.guest_client.get(own)
+
+    def test_groups_sitemap(self):
+        response = self.guest_client.get(reverse('posts:sitemap_groups'))
+        self.assertContains(
+            response, reverse('posts:group_list', args=(self.group.slug,))
+        )
+
+    def test_empty_shard(self):
+        response = self.guest_client.get(
+            reverse('posts:sitemap_posts', args=(1000,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_index_skips_empty_shards(self):
+        """Оглавление не ссылается на части, в которых не осталось
+        постов.
+        """
+        shard = (self.posts[0].pk - 1) // 2
+        Post.objects.filter(pk__lte=(shard + 1) * 2).delete()
+        response = self.guest_client.get(reverse('posts:sitemap'))
+        self.assertNotContains(
+            response, reverse('posts:sitemap_posts', args=(shard,))
+        )
+        self.assertContains(
+            response,
+            reverse(
+                'posts:sitemap_posts', args=((self.posts[-1].pk - 1) // 2,)
+            ),
+        )
+
+    @override_settings(ALLOWED_HOSTS=['first.test', 'second.test'])
+    def test_cached_body_per_host(self):
+        """Абсолютные ссылки в кеше не переходят на другой хост."""
+        address = reverse('posts:sitemap_groups')
+        self.guest_client.get(address, HTTP_HOST='first.test')
+        response = self.guest_client.get(address, HTTP_HOST='second.test')
+        self.assertContains(response, 'http://second.test/')
+        self.assertNotContains(response, 'first.test')
@@ -7,6 +7,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from posts.counters import view_counter
 from posts.forms import PostForm
 from posts.models import Comment, Group, Post, User
 
@@ -40,6 +41,9 @@ class PostCreateFormTests(TestCase):
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
+    def tearDown(self):
+        view_counter.clear()
+
     def test_create_post(self):
         """Валидная форма создает запись в Post."""
         posts_count = Post.objects.count()
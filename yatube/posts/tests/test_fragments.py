@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive_batch
+from posts.models import Follow, Group, Post, User
+from posts.utils import decode_cursor, encode_cursor
+
+
+class FeedFragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f'Пост {number}')
+            for number in range(25)
+        )
+        cls.posts = list(Post.objects.order_by('-created', '-pk'))
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def read_feed(self, client, address):
+        """Пройти ленту по курсорам, вернуть тексты постов."""
+        texts = []
+        while address:
+            response = client.get(address)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotContains(response, '<html')
+            texts += [post.text for post in response.context['posts']]
+            address = response.context['next_fragment']
+        return texts
+
+    def test_cursor_round_trip(self):
+        post = self.posts[0]
+        self.assertEqual(
+            decode_cursor(encode_cursor(post)), (post.created, post.pk)
+        )
+
+    def test_page_links_first_fragment(self):
+        """Страница ленты отдаёт адрес подгрузки после своих постов."""
+        response = self.guest_client.get(reverse('posts:index'))
+        expected = (
+            reverse('posts:index_fragment')
+            + f'?cursor={encode_cursor(self.posts[9])}'
+        )
+        self.assertEqual(response.context['next_fragment'], expected)
+        self.assertContains(response, f'data-next="{expected}"')
+
+    def test_fragments_cover_feeds(self):
+        """Подгрузка по курсорам выдаёт остаток ленты без пропусков."""
+        expected = [post.text for post in self.posts[10:]]
+        cursor = f'?cursor={encode_cursor(self.posts[9])}'
+        reader_client = Client()
+        reader_client.force_login(self.reader)
+        for client, address in (
+            (self.guest_client, reverse('posts:index_fragment')),
+            (
+                self.guest_client,
+                reverse('posts:group_fragment', args=(self.group.slug,)),
+            ),
+            (
+                self.guest_client,
+                reverse('posts:profile_fragment', args=(self.user.username,)),
+            ),
+            (reader_client, reverse('posts:follow_fragment')),
+        ):
+            with self.subTest(address=address):
+                self.assertEqual(
+                    self.read_feed(client, address + cursor), expected
+                )
+
+    def test_fragments_continue_into_archive(self):
+        Post.objects.filter(
+            pk__in=[post.pk for post in self.posts[15:]]
+        ).update(created=timezone.now() - timedelta(days=400))
+        archive_batch(timezone.now() - timedelta(days=365), 100)
+        cursor = f'?cursor={encode_cursor(self.posts[9])}'
+        texts = self.read_feed(
+            self.guest_client, reverse('posts:index_fragment') + cursor
+        )
+        self.assertEqual(len(texts), 15)
+
+    def test_bad_requests(self):
+        for cursor in ('garbage', '99999999999999999999_1',
+                       '-99999999999999999999_1', '1_99999999999999999999'):
+            with self.subTest(cursor=cursor):
+                response = self.guest_client.get(
+                    reverse('posts:index_fragment') + '?cursor=' + cursor
+                )
+                self.assertEqual(response.status_code, 404)
+        response = self.guest_client.get(reverse('posts:follow_fragment'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_follow_fragment_is_not_shared(self):
+        """Фрагмент ленты подписок не отдаётся из кеша другим."""
+        address = reverse('posts:follow_fragment')
+        reader_client = Client()
+        reader_client.force_login(self.reader)
+        response = reader_client.get(address)
+        self.assertEqual(len(response.context['posts']), 10)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(self.guest_client.get(address).status_code, 403)
+        other_client = Client()
+        other_client.force_login(self.user)
+        response = other_client.get(address)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['posts']), 0)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive_batch
+from posts.models import (FanoutTask, Follow, Notification, Post,
+                          UnreadCounter, User)
+from posts.notifications import fanout, fanout_chunk, unread_count
+
+
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.followers = [
+            User.objects.create_user(username=f'Follower{number}')
+            for number in range(3)
+        ]
+        cls.stranger = User.objects.create_user(username='Stranger')
+        for follower in cls.followers:
+            Follow.objects.create(user=follower, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.follower_client = Client()
+        self.follower_client.force_login(self.followers[0])
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Новый пост ставит рассылку, которая доходит только
+        до подписчиков.
+        """
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertTrue(FanoutTask.objects.filter(post=post).exists())
+        self.assertEqual(fanout(), len(self.followers))
+        self.assertFalse(FanoutTask.objects.exists())
+        self.assertEqual(
+            set(Notification.objects.values_list('user', flat=True)),
+            {follower.pk for follower in self.followers},
+        )
+        self.assertEqual(unread_count(self.followers[0]), 1)
+        self.assertEqual(unread_count(self.stranger), 0)
+
+    def test_fanout_goes_in_chunks(self):
+        """Рассылка идёт пачками и продолжается с курсора."""
+        Post.objects.create(author=self.author, text='Новый пост')
+        task = FanoutTask.objects.get()
+        self.assertEqual(fanout_chunk(task, chunk_size=2), 2)
+        self.assertEqual(Notification.objects.count(), 2)
+        task = FanoutTask.objects.get()
+        self.assertEqual(fanout_chunk(task, chunk_size=2), 1)
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertFalse(FanoutTask.objects.exists())
+
+    def test_stale_chunk_is_not_sent_twice(self):
+        """Пачку, которую уже забрал другой обработчик, не рассылают."""
+        Post.objects.create(author=self.author, text='Новый пост')
+        task = FanoutTask.objects.get()
+        stale = FanoutTask.objects.get()
+        fanout_chunk(task, chunk_size=2)
+        self.assertIsNone(fanout_chunk(stale, chunk_size=2))
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_badge_and_mark_read(self):
+        """Счётчик виден в шапке и сбрасывается на странице уведомлений."""
+        Post.objects.create(author=self.author, text='Новый пост')
+        Post.objects.create(author=self.author, text='Ещё пост')
+        fanout()
+        response = self.follower_client.get(reverse('posts:follow_index'))
+        self.assertContains(response, '<span class="badge bg-danger">2')
+        response = self.follower_client.get(reverse('posts:notifications'))
+        self.assertEqual(len(response.context['page_obj']), 2)
+        self.assertContains(response, 'Новое', count=2)
+        self.assertEqual(unread_count(self.followers[0]), 0)
+        self.assertFalse(
+            Notification.objects.filter(
+                user=self.followers[0], is_read=False
+            ).exists()
+        )
+
+    def test_only_shown_notifications_are_read(self):
+        """Уведомления, не попавшие на страницу, остаются
+        непрочитанными.
+        """
+        for number in range(settings.POSTS_PER_PAGE + 1):
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+        fanout()
+        self.follower_client.get(reverse('posts:notifications'))
+        self.assertEqual(unread_count(self.followers[0]), 1)
+        self.assertEqual(
+            Notification.objects.filter(
+                user=self.followers[0], is_read=False
+            ).count(),
+            1,
+        )
+
+    def test_archived_post_leaves_badge(self):
+        """Удалённое при архивации уведомление вычитается из счётчика."""
+        post = Post.objects.create(author=self.author, text='Старый пост')
+        Post.objects.create(author=self.author, text='Новый пост')
+        fanout()
+        self.assertEqual(unread_count(self.followers[0]), 2)
+        Post.objects.filter(pk=post.pk).update(
+            created=timezone.now() - timedelta(days=400)
+        )
+        archive_batch(timezone.now() - timedelta(days=365), 100)
+        self.assertEqual(unread_count(self.followers[0]), 1)
+        self.assertEqual(
+            UnreadCounter.objects.get(user=self.followers[0]).unread, 1
+        )
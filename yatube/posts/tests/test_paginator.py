@@ -0,0 +1,36 @@
+from django.test import RequestFactory, SimpleTestCase
+
+from posts.utils import WindowedPaginator, paginator
+
+ELLIPSIS = WindowedPaginator.ELLIPSIS
+
+
+class WindowedPaginatorTests(SimpleTestCase):
+    def test_short_range_is_complete(self):
+        paginator = WindowedPaginator(range(100), 10)
+        self.assertEqual(
+            list(paginator.get_elided_page_range(5)), list(range(1, 11))
+        )
+
+    def test_long_range_is_elided(self):
+        """Показываются края и окрестность текущей страницы."""
+        paginator = WindowedPaginator(range(2_000_000), 10)
+        self.assertEqual(
+            list(paginator.get_elided_page_range(1)),
+            [1, 2, 3, 4, ELLIPSIS, 199999, 200000],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(100)),
+            [1, 2, ELLIPSIS, 97, 98, 99, 100, 101, 102, 103, ELLIPSIS,
+             199999, 200000],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(200000)),
+            [1, 2, ELLIPSIS, 199997, 199998, 199999, 200000],
+        )
+
+    def test_page_knows_its_range(self):
+        request = RequestFactory().get('/', {'page': 50})
+        page = paginator(request, range(2_000_000))
+        self.assertIn(50, page.elided_page_range)
+        self.assertLessEqual(len(page.elided_page_range), 13)
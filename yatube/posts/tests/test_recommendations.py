@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Recommendation, User
+from posts.recommendations import FollowGraph, build_recommendations
+
+
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.friend = User.objects.create_user(username='Friend')
+        cls.neighbour = User.objects.create_user(username='Neighbour')
+        cls.author = User.objects.create_user(username='Author')
+        cls.popular = User.objects.create_user(username='Popular')
+        Follow.objects.bulk_create([
+            Follow(user=cls.reader, author=cls.friend),
+            Follow(user=cls.friend, author=cls.author),
+            Follow(user=cls.friend, author=cls.popular),
+            Follow(user=cls.neighbour, author=cls.friend),
+            Follow(user=cls.neighbour, author=cls.popular),
+        ])
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        cache.clear()
+
+    def test_graph_recommendations(self):
+        """Рекомендации учитывают подписки друзей и совместные
+        подписки, исключая уже прочитанных авторов.
+        """
+        graph = FollowGraph.load()
+        self.assertEqual(
+            list(graph.followers(self.friend.pk)),
+            sorted([self.reader.pk, self.neighbour.pk])
+        )
+        recommended = [
+            author_id for author_id, _ in graph.recommend(self.reader.pk, 5)
+        ]
+        self.assertEqual(recommended[0], self.popular.pk)
+        self.assertIn(self.author.pk, recommended)
+        self.assertNotIn(self.friend.pk, recommended)
+        self.assertNotIn(self.reader.pk, recommended)
+
+    def test_build_replaces_table(self):
+        """Пересчёт заменяет таблицу рекомендаций целиком."""
+        Recommendation.objects.create(
+            user=self.reader, author=self.neighbour, score=100
+        )
+        count = build_recommendations(limit=1)
+        self.assertEqual(Recommendation.objects.count(), count)
+        self.assertEqual(
+            self.reader.recommendations.get().author, self.popular
+        )
+
+    def test_command_and_views(self):
+        """Рекомендации выводятся в ленте подписок и на профиле."""
+        call_command('build_recommendations', stdout=StringIO())
+        for address in (
+            reverse('posts:follow_index'),
+            reverse('posts:profile', args={self.friend}),
+        ):
+            with self.subTest(address=address):
+                response = self.reader_client.get(address)
+                self.assertIn(
+                    self.popular,
+                    [rec.author for rec in response.context['recommendations']]
+                )
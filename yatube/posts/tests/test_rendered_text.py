@@ -0,0 +1,53 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template.defaultfilters import truncatechars
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.counters import view_counter
+from posts.models import Post, User
+
+
+class RenderedTextTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='writer')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Первая <b>строка</b>\nвторая строка поста'
+        )
+
+    def tearDown(self):
+        view_counter.clear()
+
+    def test_rendered_on_save(self):
+        """HTML и начало текста готовятся при сохранении поста."""
+        self.assertEqual(
+            self.post.text_html,
+            'Первая &lt;b&gt;строка&lt;/b&gt;<br>вторая строка поста'
+        )
+        self.assertEqual(
+            self.post.text_excerpt, truncatechars(self.post.text, 30)
+        )
+        self.post.text = 'Новый текст'
+        self.post.save(update_fields=('text',))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html, 'Новый текст')
+
+    def test_backfill_command(self):
+        Post.objects.filter(pk=self.post.pk).update(
+            text_html='', text_excerpt=''
+        )
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.body_html, self.post.text_html)
+        call_command('render_post_texts', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, self.post.text_html)
+        self.assertEqual(post.text_excerpt, self.post.text_excerpt)
+
+    def test_templates_use_stored_html(self):
+        Post.objects.filter(pk=self.post.pk).update(text_html='<i>готово</i>')
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertContains(response, '<i>готово</i>')
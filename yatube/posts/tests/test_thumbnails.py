@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend
+
+from posts.models import Post, User
+from posts.thumbnails import (GEOMETRY, OPTIONS, post_thumbnail,
+                              prefetch_thumbnails, thumbnail_file)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailPrefetchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='painter')
+        for number in range(3):
+            Post.objects.create(
+                author=cls.user,
+                text=f'Пост {number}',
+                image=SimpleUploadedFile(
+                    f'small{number}.gif', SMALL_GIF, content_type='image/gif'
+                ),
+            )
+        Post.objects.create(author=cls.user, text='Без картинки')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def remember_thumbnail(self, post):
+        """Записать миниатюру в хранилище sorl, как после её создания."""
+        thumbnail = thumbnail_file(post.image)
+        thumbnail.set_size((960, 339))
+        default.kvstore.set(thumbnail)
+        return thumbnail
+
+    def test_one_query_for_page(self):
+        """Миниатюры всей страницы читаются одним запросом к базе."""
+        created = {
+            post.pk: self.remember_thumbnail(post).name
+            for post in Post.objects.exclude(image='')
+        }
+        cache.clear()
+        posts = list(Post.objects.all())
+        with self.assertNumQueries(1):
+            prefetch_thumbnails(posts)
+        with self.assertNumQueries(0):
+            prefetch_thumbnails(posts)
+        for post in posts:
+            with self.subTest(post=post.pk):
+                if post.image:
+                    self.assertEqual(
+                        post_thumbnail(post).name, created[post.pk]
+                    )
+                else:
+                    self.assertFalse(hasattr(post, 'prefetched_thumbnail'))
+
+    def test_missing_thumbnail_is_not_prefetched(self):
+        """Несозданную миниатюру тег получит у sorl сам."""
+        post = Post.objects.exclude(image='').first()
+        prefetch_thumbnails([post])
+        self.assertFalse(hasattr(post, 'prefetched_thumbnail'))
+
+    def test_name_matches_sorl(self):
+        """Имя, вычисленное через внутренние методы sorl, совпадает
+        с именем миниатюры, которую создаёт sorl.
+        """
+        def create(backend, source_image, geometry, options, thumbnail):
+            thumbnail.set_size((960, 339))
+
+        post = Post.objects.exclude(image='').first()
+        cache.clear()
+        with mock.patch.object(
+            ThumbnailBackend, '_create_thumbnail', autospec=True,
+            side_effect=create,
+        ):
+            created = get_thumbnail(post.image, GEOMETRY, **OPTIONS)
+        self.assertEqual(thumbnail_file(post.image).name, created.name)
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from math import log2
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import trending
+from posts.models import Comment, Group, Post, User
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.quiet_group = Group.objects.create(
+            title='Тихая группа',
+            slug='quiet',
+            description='Тестовое описание',
+        )
+        cls.busy_group = Group.objects.create(
+            title='Активная группа',
+            slug='busy',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_scores_decay_over_time(self):
+        """Свежее событие важнее старого события того же веса,
+        а сложение оценок совпадает с суммой весов.
+        """
+        now = timezone.now()
+        old = trending.event_score(
+            1, now - timedelta(seconds=settings.TRENDING_HALF_LIFE)
+        )
+        new = trending.event_score(1, now)
+        self.assertAlmostEqual(new - old, 1)
+        self.assertAlmostEqual(
+            trending.add_scores(new, new), new + log2(2)
+        )
+
+    def test_signals_update_scores(self):
+        """Новые посты и комментарии поднимают группы и посты."""
+        Post.objects.create(
+            author=self.user, text='Тихий пост', group=self.quiet_group
+        )
+        post = Post.objects.create(
+            author=self.user, text='Активный пост', group=self.busy_group
+        )
+        self.assertGreater(post.trending_score, 0)
+        Comment.objects.create(post=post, author=self.user, text='Ещё')
+        self.busy_group.refresh_from_db()
+        self.quiet_group.refresh_from_db()
+        self.assertGreater(
+            self.busy_group.trending_score, self.quiet_group.trending_score
+        )
+        self.assertEqual(
+            trending.trending_groups(), [self.busy_group, self.quiet_group]
+        )
+        self.assertEqual(trending.trending_posts()[0], post)
+
+    def test_trending_page_without_aggregation(self):
+        """Страница популярного отдаётся из кеша без запросов."""
+        Post.objects.create(
+            author=self.user, text='Активный пост', group=self.busy_group
+        )
+        response = self.guest_client.get(reverse('posts:trending'))
+        self.assertContains(response, self.busy_group.title)
+        with self.assertNumQueries(0):
+            self.guest_client.get(reverse('posts:trending'))
+
+    def test_trending_page_header_is_personal(self):
+        """Шапка из кеша страницы не показывается другим посетителям."""
+        user_client = Client()
+        user_client.force_login(self.user)
+        response = user_client.get(reverse('posts:trending'))
+        self.assertContains(response, self.user.username)
+        response = self.guest_client.get(reverse('posts:trending'))
+        self.assertNotContains(response, self.user.username)
@@ -3,6 +3,7 @@ from http import HTTPStatus
 from django.core.cache import cache
 from django.test import Client, TestCase
 
+from posts.counters import view_counter
 from posts.models import Group, Post, User
 
 
@@ -40,6 +41,9 @@ class PostURLTests(TestCase):
         self.author_client.force_login(self.author)
         cache.clear()
 
+    def tearDown(self):
+        view_counter.clear()
+
     def test_urls_exists_at_desired_location(self):
         """Страницы доступны пользователям."""
         for address in self.URLS_FOR_ALL:
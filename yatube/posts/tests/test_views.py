@@ -6,9 +6,12 @@ from django import forms
 from django.conf import settings
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from posts.counters import view_counter
+from posts.following import following_set
 from posts.forms import PostForm
 from posts.models import Follow, Group, Post, User
 
@@ -62,6 +65,9 @@ class PostPagesTests(TestCase):
         self.authorized_client.force_login(self.user)
         cache.clear()
 
+    def tearDown(self):
+        view_counter.clear()
+
     def post_exist(self, response, group=False):
         if 'page_obj' in response.context:
             post = response.context['page_obj'][0]
@@ -170,13 +176,13 @@ class PostPagesTests(TestCase):
             reverse('posts:index')
         )
         response_content_1 = response_1.content
-        new_post.delete()
+        Post.objects.filter(pk=new_post.pk).update(text='Изменено в обход')
         response_2 = self.authorized_client.get(
             reverse('posts:index')
         )
         response_content_2 = response_2.content
         self.assertEqual(response_content_1, response_content_2)
-        cache.clear()
+        new_post.delete()
         response_3 = self.authorized_client.get(
             reverse('posts:index')
         )
@@ -352,3 +358,55 @@ class FollowTests(TestCase):
             reverse('posts:follow_index')
         )
         self.assertTrue(len(response.context['page_obj']) == 0)
+
+    def test_following_set_in_sync(self):
+        """Закешированные подписки обновляются при подписке
+        и отписке.
+        """
+        cache.clear()
+        self.assertNotIn(self.author, following_set(self.user))
+        self.authorized_client.post(
+            reverse('posts:profile_follow', args={self.author})
+        )
+        self.assertIn(self.author, following_set(self.user))
+        self.assertEqual(
+            following_set(self.user).intersection(
+                [self.author.pk, self.follower.pk]
+            ),
+            {self.author.pk}
+        )
+        self.authorized_client.post(
+            reverse('posts:profile_unfollow', args={self.author})
+        )
+        self.assertNotIn(self.author, following_set(self.user))
+
+    def test_following_set_after_orm_changes(self):
+        """Подписки, изменённые в обход представлений, тоже сбрасывают
+        кеш.
+        """
+        cache.clear()
+        self.assertNotIn(self.author, following_set(self.user))
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        self.assertIn(self.author, following_set(self.user))
+        follow.delete()
+        self.assertNotIn(self.author, following_set(self.user))
+
+    def test_following_template_tags(self):
+        """Теги шаблона проверяют подписку без запросов на каждого
+        автора.
+        """
+        cache.clear()
+        Follow.objects.create(user=self.user, author=self.author)
+        template = Template(
+            '{% load follow_tags %}{% following_authors as following %}'
+            '{% for author in authors %}'
+            '{% if author.pk in following %}+{% else %}-{% endif %}'
+            '{% endfor %}{% is_following author as flag %}{{ flag }}'
+        )
+        context = Context({
+            'user': self.user,
+            'authors': [self.author, self.follower],
+            'author': self.author,
+        })
+        with self.assertNumQueries(1):
+            self.assertEqual(template.render(context), '+-True')
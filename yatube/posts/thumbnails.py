@@ -0,0 +1,96 @@
+import logging
+
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore
+
+from core.sql import repeated_queries_allowed
+
+logger = logging.getLogger(__name__)
+
+GEOMETRY = '960x339'
+OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+def thumbnail_file(image):
+    """Файл миниатюры ``image``, который создаёт для постов sorl.
+
+    Параметры дополняются так же, как в ``ThumbnailBackend.get_thumbnail``,
+    иначе имя миниатюры не совпадёт с тем, что создаёт sorl. Публичного
+    способа узнать имя без создания миниатюры у sorl нет, поэтому версия
+    закреплена в requirements.txt, а совпадение имён проверяет тест.
+    """
+    backend = default.backend
+    source = ImageFile(image)
+    options = dict(OPTIONS)
+    if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(thumbnail_settings, attr)
+        if value != getattr(default_settings, attr):
+            options.setdefault(key, value)
+    name = backend._get_thumbnail_filename(source, GEOMETRY, options)
+    return ImageFile(name, default.storage)
+
+
+def get_raw_many(keys):
+    """Значения ключей sorl одним запросом к кешу и одним к базе."""
+    kvstore = default.kvstore
+    if not isinstance(kvstore, cached_db_kvstore.KVStore):
+        return {key: kvstore._get_raw(key) for key in keys}
+    values = kvstore.cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        stored = dict(
+            KVStore.objects.filter(key__in=missing).values_list('key', 'value')
+        )
+        kvstore.cache.set_many(
+            stored, thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT
+        )
+        values.update(stored)
+    return {
+        key: value for key, value in values.items()
+        if value and value != cached_db_kvstore.EMPTY_VALUE
+    }
+
+
+def prefetch_thumbnails(posts):
+    """Найти миниатюры всех постов страницы за один проход.
+
+    Найденные лежат в ``post.prefetched_thumbnail``. Миниатюры, которых
+    ещё нет, тег ``post_thumbnail`` создаст обычным путём.
+    """
+    wanted = {}
+    for post in posts:
+        image = getattr(post, 'image', None)
+        if image:
+            key = add_prefix(thumbnail_file(image).key)
+            wanted.setdefault(key, []).append(post)
+    if not wanted:
+        return
+    for key, value in get_raw_many(list(wanted)).items():
+        thumbnail = deserialize_image_file(value)
+        for post in wanted[key]:
+            post.prefetched_thumbnail = thumbnail
+
+
+def post_thumbnail(post):
+    """Миниатюра поста из предзагрузки или через sorl."""
+    prefetched = getattr(post, 'prefetched_thumbnail', None)
+    if prefetched is not None:
+        return prefetched
+    try:
+        # Новые миниатюры создаются по одной, это не N+1.
+        with repeated_queries_allowed():
+            return get_thumbnail(post.image, GEOMETRY, **OPTIONS)
+    except Exception:
+        if thumbnail_settings.THUMBNAIL_DEBUG:
+            raise
+        logger.exception('Не удалось получить миниатюру поста %s', post.pk)
+        return None
@@ -0,0 +1,75 @@
+"""Популярные группы и посты.
+
+Оценка хранится в логарифмической шкале относительно фиксированной
+эпохи: ``score = log2(sum(weight * 2 ** (t / half_life)))``. Поэтому
+новое событие просто прибавляется к оценке, а затухание со временем
+не требует пересчёта: порядок по ``score`` всегда совпадает с порядком
+по затухшей популярности на текущий момент.
+"""
+from datetime import datetime
+from math import log2
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Group, Post
+
+EPOCH = datetime(2022, 1, 1, tzinfo=timezone.utc)
+POST_WEIGHT = 1.0
+COMMENT_WEIGHT = 0.5
+TRENDING_GROUPS_KEY = 'trending:groups'
+TRENDING_POSTS_KEY = 'trending:posts'
+
+
+def event_score(weight, when=None):
+    """Оценка одного события с весом weight в момент when."""
+    when = when or timezone.now()
+    elapsed = (when - EPOCH).total_seconds()
+    return log2(weight) + elapsed / settings.TRENDING_HALF_LIFE
+
+
+def add_scores(first, second):
+    """Сложить две оценки в логарифмической шкале."""
+    high, low = max(first, second), min(first, second)
+    return high + log2(1 + 2 ** (low - high))
+
+
+def bump(model, pk, weight, when=None):
+    """Учесть новое событие в оценке объекта."""
+    if pk is None:
+        return
+    score = event_score(weight, when)
+    with transaction.atomic():
+        queryset = model.objects.select_for_update().filter(pk=pk)
+        current = queryset.values_list('trending_score', flat=True).first()
+        if current is None:
+            return
+        if current:
+            score = add_scores(current, score)
+        queryset.update(trending_score=score)
+
+
+def trending_groups():
+    """Популярные группы из кеша, без агрегирующих запросов."""
+    return cache.get_or_set(
+        TRENDING_GROUPS_KEY,
+        lambda: list(
+            Group.objects.filter(trending_score__gt=0)
+            .order_by('-trending_score')[:settings.TRENDING_GROUPS_SHOWN]
+        ),
+        settings.TRENDING_CACHE_TIMEOUT,
+    )
+
+
+def trending_posts():
+    """Популярные посты из кеша, без агрегирующих запросов."""
+    return cache.get_or_set(
+        TRENDING_POSTS_KEY,
+        lambda: list(
+            Post.objects.select_related('author', 'group')
+            .order_by('-trending_score')[:settings.TRENDING_POSTS_SHOWN]
+        ),
+        settings.TRENDING_CACHE_TIMEOUT,
+    )
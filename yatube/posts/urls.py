@@ -1,14 +1,27 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.urls import path
 
-from . import views
+from core.media import serve_media
+
+from . import sitemaps, views
+from .feeds import AuthorFeed, GroupFeed, author_feed_key, group_feed_key
+from .utils import versioned
 
 app_name = 'posts'
 
 urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path(
+        'group/<slug:slug>/feed/',
+        versioned(group_feed_key)(GroupFeed()),
+        name='group_feed'
+    ),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/feed/',
+        versioned(author_feed_key)(AuthorFeed()),
+        name='author_feed'
+    ),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
         'posts/<int:post_id>/comment/',
@@ -18,6 +31,10 @@ urlpatterns = [
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('follow/', views.follow_index, name='follow_index'),
+    path(
+        'notifications/', views.notifications, name='notifications'
+    ),
+    path('trending/', views.trending, name='trending'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -28,10 +45,45 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap'),
+    path(
+        'sitemap-groups.xml',
+        sitemaps.sitemap_groups,
+        name='sitemap_groups'
+    ),
+    path(
+        'sitemap-posts-<int:shard>.xml',
+        sitemaps.sitemap_posts,
+        name='sitemap_posts'
+    ),
+    path(
+        'fragments/index/',
+        views.feed_fragment,
+        {'feed': 'index'},
+        name='index_fragment'
+    ),
+    path(
+        'fragments/group/<slug:name>/',
+        views.feed_fragment,
+        {'feed': 'group'},
+        name='group_fragment'
+    ),
+    path(
+        'fragments/profile/<str:name>/',
+        views.feed_fragment,
+        {'feed': 'profile'},
+        name='profile_fragment'
+    ),
+    path(
+        'fragments/follow/',
+        views.follow_fragment,
+        name='follow_fragment'
+    ),
     path('', views.index, name='index'),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
+urlpatterns.insert(0, path(
+    settings.MEDIA_URL.lstrip('/') + '<path:path>',
+    serve_media,
+    name='media'
+))
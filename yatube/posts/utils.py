@@ -1,8 +1,245 @@
+import calendar
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
 from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.db import connections, router
+from django.db.models import Q
+from django.http import HttpResponse
+from django.urls import reverse
+from django.views.decorators.http import condition
+
+from .thumbnails import prefetch_thumbnails
+
+
+class WindowedPaginator(Paginator):
+    """Пагинатор, который не перечисляет все номера страниц.
+
+    Навигация показывает края и окрестность текущей страницы, а
+    пропуски заменяет ``ELLIPSIS``. Её размер не зависит от числа
+    постов.
+    """
+
+    ELLIPSIS = '…'
+
+    def get_elided_page_range(self, number=1, on_each_side=3, on_ends=2):
+        """Номера страниц вокруг ``number``, по ``on_ends`` с краёв."""
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > 1 + on_each_side + on_ends + 1:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
 
 
 def paginator(request, post_list):
-    paginator = Paginator(post_list, settings.POSTS_PER_PAGE)
+    paginator = WindowedPaginator(post_list, settings.POSTS_PER_PAGE)
     page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.elided_page_range = list(
+        paginator.get_elided_page_range(page_obj.number)
+    )
+    page_obj.count_is_approximate = getattr(post_list, 'approximate', False)
+    page_obj.object_list = list(page_obj.object_list)
+    prefetch_thumbnails(page_obj.object_list)
     return page_obj
+
+
+def estimated_rows(model):
+    """Оценка числа строк таблицы по статистике базы.
+
+    Возвращает ``None``, если база статистики не ведёт или её ещё не
+    собирали (``ANALYZE``).
+    """
+    connection = connections[router.db_for_read(model)]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s', [table]
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table]
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    # sqlite_stat1.stat — строка «строк ...», reltuples — float,
+    # -1 у ещё не проанализированной таблицы.
+    value = row[0]
+    if isinstance(value, str):
+        value = value.split()[0]
+    rows = int(float(value))
+    return rows if rows >= 0 else None
+
+
+class CountProvider:
+    """Число строк запроса для пагинации без COUNT(*) на каждый запрос.
+
+    Порядок источников:
+
+    * ведомый счётчик ``key`` в кеше, который сигналы меняют при
+      создании и удалении постов (``maintained=True``) — точное число;
+    * оценка по статистике базы для запроса по всей таблице, если
+      строк больше ``COUNT_ESTIMATE_THRESHOLD`` — приблизительное число;
+    * COUNT(*), закешированный на ``COUNT_CACHE_TIMEOUT`` секунд.
+
+    ``approximate`` сообщает, что число оценочное.
+    """
+
+    def __init__(self, queryset, key=None, maintained=False):
+        self.queryset = queryset
+        self.maintained = maintained and key is not None
+        if key is None:
+            digest = hashlib.md5(str(queryset.query).encode()).hexdigest()
+            key = f'count:query:{digest}'
+        self.key = key
+        self.approximate = False
+
+    def count(self):
+        count = cache.get(self.key)
+        if count is not None:
+            return count
+        if not self.queryset.query.where:
+            estimate = estimated_rows(self.queryset.model)
+            if (
+                estimate is not None
+                and estimate >= settings.COUNT_ESTIMATE_THRESHOLD
+            ):
+                self.approximate = True
+                return estimate
+        count = self.queryset.count()
+        timeout = (
+            settings.MAINTAINED_COUNT_TIMEOUT if self.maintained
+            else settings.COUNT_CACHE_TIMEOUT
+        )
+        # Пока шёл COUNT(*), другой процесс мог записать счётчик, и
+        # сигналы уже его поправили: такое значение точнее нашего.
+        if not cache.add(self.key, count, timeout):
+            count = cache.get(self.key, count)
+        return count
+
+
+def adjust_counts(keys, delta):
+    """Поправить ведомые счётчики, которые уже есть в кеше."""
+    for key in keys:
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            pass
+
+
+def encode_cursor(post):
+    """Курсор ленты после поста: время создания в микросекундах и pk."""
+    created = post.created
+    micros = calendar.timegm(created.utctimetuple()) * 10**6
+    return f'{micros + created.microsecond}_{post.pk}'
+
+
+def decode_cursor(cursor):
+    """Разобрать курсор; на испорченном курсоре ``ValueError``."""
+    micros, pk = cursor.split('_')
+    micros, pk = int(micros), int(pk)
+    if not 0 < pk < 2 ** 63:
+        raise ValueError('pk вне диапазона')
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    try:
+        return epoch + timedelta(microseconds=micros), pk
+    except OverflowError:
+        raise ValueError('время вне диапазона')
+
+
+def after_cursor(queryset, cursor=None):
+    """Посты старше курсора, от новых к старым."""
+    queryset = queryset.order_by('-created', '-pk')
+    if cursor is None:
+        return queryset
+    created, pk = cursor
+    return queryset.filter(
+        Q(created__lt=created) | Q(created=created, pk__lt=pk)
+    )
+
+
+def next_fragment_url(page_obj, viewname, *args):
+    """Адрес подгрузки постов, следующих за страницей ``page_obj``."""
+    if not page_obj.has_next():
+        return None
+    cursor = encode_cursor(page_obj[len(page_obj) - 1])
+    return f'{reverse(viewname, args=args)}?cursor={cursor}'
+
+
+def post_surrogate_keys(post):
+    """Ключи внешнего кеша для страниц, на которых виден пост."""
+    keys = ['index', f'post-{post.pk}', f'author-{post.author_id}']
+    if post.group_id:
+        keys.append(f'group-{post.group_id}')
+    return keys
+
+
+def post_page_key(post_id):
+    """Ключ метки версии страницы поста."""
+    return f'page:post:{post_id}'
+
+
+def data_version(key):
+    """Метка версии данных; меняется после ``bump_version``."""
+    return cache.get_or_set(key, lambda: uuid.uuid4().hex, None)
+
+
+def bump_version(*keys):
+    """Сбросить метки версий, чтобы ответы по ним пересобрались."""
+    cache.delete_many(keys)
+
+
+def versioned(version_key):
+    """Отдавать ответ из кеша, пока не сменилась версия его данных.
+
+    ``version_key`` получает аргументы вью и возвращает ключ метки
+    версии. Метка служит ETag, поэтому клиент с актуальной копией
+    получает 304 без сборки ответа. В ответах абсолютные ссылки, поэтому
+    тело кешируется отдельно для каждого хоста.
+    """
+    def etag(request, *args, **kwargs):
+        return data_version(version_key(*args, **kwargs))
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = version_key(*args, **kwargs)
+            body_key = (
+                f'{key}:body:{data_version(key)}:{request.get_host()}'
+            )
+            cached = cache.get(body_key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(
+                    body_key, (response.content, response['Content-Type']),
+                    settings.VERSIONED_CACHE_TIMEOUT,
+                )
+            return response
+        return condition(etag_func=etag)(wrapper)
+    return decorator
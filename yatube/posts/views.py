@@ -1,70 +1,192 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.views.decorators.cache import cache_control, cache_page
 
+from core.holes import cache_with_holes
+from core.surrogates import add_surrogate_keys
+
+from .counters import view_counter
+from .feeds import INDEX_FEED_KEY, author_feed_key, group_feed_key
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post
-from .utils import paginator
+from .models import ArchivedPost, Follow, Group, Post
+from .notifications import mark_read
+from .thumbnails import prefetch_thumbnails
+from .trending import trending_groups, trending_posts
+from .utils import (data_version, decode_cursor, encode_cursor,
+                    next_fragment_url, paginator, post_page_key)
 
 User = get_user_model()
 
 
-@cache_page(20, key_prefix='index_page')
+def _post_keys(page_obj):
+    return (f'post-{post.pk}' for post in page_obj)
+
+
+@cache_with_holes(
+    settings.PAGE_CACHE_TIMEOUT, 'index',
+    version=lambda: data_version(INDEX_FEED_KEY),
+)
 def index(request):
     """Получить последние десять из всех записей."""
-    post_list = Post.objects.all()
+    post_list = Post.objects.with_archive()
     page_obj = paginator(request, post_list)
     context = {
         'page_obj': page_obj,
+        'next_fragment': next_fragment_url(page_obj, 'posts:index_fragment'),
     }
-    return render(request, 'posts/index.html', context)
+    response = render(request, 'posts/index.html', context)
+    return add_surrogate_keys(response, 'index', *_post_keys(page_obj))
 
 
+@cache_with_holes(
+    settings.PAGE_CACHE_TIMEOUT, 'group',
+    version=lambda slug: data_version(group_feed_key(slug)),
+)
 def group_posts(request, slug):
     """Получить последние десять из записей группы."""
     group: Group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
+    post_list = Post.objects.with_archive(group=group)
     page_obj = paginator(request, post_list)
     context = {
         'group': group,
         'page_obj': page_obj,
+        'next_fragment': next_fragment_url(
+            page_obj, 'posts:group_fragment', slug
+        ),
     }
-    return render(request, 'posts/group_list.html', context)
+    response = render(request, 'posts/group_list.html', context)
+    return add_surrogate_keys(
+        response, f'group-{group.pk}', *_post_keys(page_obj)
+    )
 
 
+@cache_with_holes(
+    settings.PAGE_CACHE_TIMEOUT, 'profile',
+    version=lambda username: data_version(author_feed_key(username)),
+)
 def profile(request, username):
     """Показать страницу автора"""
     author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
+    post_list = Post.objects.with_archive(author=author)
     page_obj = paginator(request, post_list)
-    following = (
-        request.user.is_authenticated
-        and author.following
-        .filter(user=request.user)
-        .exists()
-    )
     context = {
         'page_obj': page_obj,
         'author': author,
-        'following': following,
+        'next_fragment': next_fragment_url(
+            page_obj, 'posts:profile_fragment', username
+        ),
     }
-    return render(request, 'posts/profile.html', context)
+    response = render(request, 'posts/profile.html', context)
+    return add_surrogate_keys(
+        response, f'author-{author.pk}', *_post_keys(page_obj)
+    )
 
 
 def post_detail(request, post_id):
     """Показать информацию о посте"""
-    post = get_object_or_404(Post, id=post_id)
-    form = CommentForm(
-        request.POST or None
-    )
-    comments = post.comments.all()
+    view_counter.hit(post_id)
+    try:
+        return cached_post_detail(request, post_id)
+    except Http404:
+        view_counter.cancel(post_id)
+        raise
+
+
+@cache_with_holes(
+    settings.PAGE_CACHE_TIMEOUT, 'post',
+    version=lambda post_id: data_version(post_page_key(post_id)),
+)
+def cached_post_detail(request, post_id):
+    """Общая для всех посетителей часть страницы поста."""
+    post = Post.objects.filter(id=post_id).first()
+    if post is None:
+        return archived_post_detail(request, post_id)
     context = {
         'post': post,
-        'form': form,
-        'comments': comments,
+        'form': CommentForm(),
+        'comments': post.comments.select_related('author'),
     }
-    return render(request, 'posts/post_detail.html', context)
+    response = render(request, 'posts/post_detail.html', context)
+    return add_surrogate_keys(response, f'post-{post.pk}')
+
+
+def archived_post_detail(request, post_id):
+    """Показать пост из архива: без комментирования и правки."""
+    post = get_object_or_404(ArchivedPost, id=post_id)
+    context = {
+        'post': post,
+        'comments': post.comments.select_related('author'),
+        'views': post.views,
+        'archived': True,
+    }
+    response = render(request, 'posts/post_detail.html', context)
+    return add_surrogate_keys(response, f'post-{post.pk}')
+
+
+@cache_with_holes(settings.TRENDING_CACHE_TIMEOUT, 'trending')
+def trending(request):
+    """Показать популярные группы и посты."""
+    context = {
+        'trending_groups': trending_groups(),
+        'trending_posts': trending_posts(),
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+@cache_page(settings.FRAGMENT_CACHE_TIMEOUT, key_prefix='fragment')
+def feed_fragment(request, feed, name=None):
+    """Следующие посты общей ленты после курсора, без обвязки страницы.
+
+    Курсор не сдвигается от новых постов, поэтому ответ по одному и
+    тому же адресу стабилен и хорошо кешируется.
+    """
+    if feed == 'group':
+        filters = {'group': get_object_or_404(Group, slug=name)}
+    elif feed == 'profile':
+        filters = {'author': get_object_or_404(User, username=name)}
+    else:
+        filters = {}
+    return render_fragment(request, feed, filters)
+
+
+@cache_control(private=True)
+def follow_fragment(request):
+    """Следующие посты ленты подписок.
+
+    Ответ у каждого пользователя свой, поэтому он не кешируется
+    целиком, как фрагменты общих лент.
+    """
+    if not request.user.is_authenticated:
+        return HttpResponseForbidden()
+    return render_fragment(
+        request, 'follow', {'author__following__user': request.user}
+    )
+
+
+def render_fragment(request, feed, filters):
+    cursor = request.GET.get('cursor')
+    try:
+        cursor = cursor and decode_cursor(cursor)
+    except ValueError:
+        raise Http404('Неверный курсор.')
+    size = settings.POSTS_PER_PAGE
+    posts = Post.objects.with_archive(**filters).after(cursor, size)
+    prefetch_thumbnails(posts)
+    next_fragment = None
+    if len(posts) == size:
+        next_fragment = (
+            f'{request.path}?cursor={encode_cursor(posts[-1])}'
+        )
+    context = {
+        'posts': posts,
+        'next_fragment': next_fragment,
+        'author_reference_flag': feed != 'profile',
+        'group_reference_flag': feed != 'group',
+    }
+    return render(request, 'posts/includes/fragment.html', context)
 
 
 @login_required
@@ -114,7 +236,7 @@ def add_comment(request, post_id):
         comment.post = post
         comment.save()
         return redirect('posts:post_detail', post_id=post_id)
-    comments = post.comments.all()
+    comments = post.comments.select_related('author')
     context = {
         'post': post,
         'form': form,
@@ -125,14 +247,34 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
+    post_list = Post.objects.with_archive(
+        author__following__user=request.user
+    )
     page_obj = paginator(request, post_list)
     context = {
         'page_obj': page_obj,
+        'next_fragment': next_fragment_url(
+            page_obj, 'posts:follow_fragment'
+        ),
     }
     return render(request, 'posts/follow.html', context)
 
 
+@login_required
+def notifications(request):
+    """Показать уведомления о новых постах и отметить их прочитанными."""
+    notification_list = request.user.notifications.select_related(
+        'post__author', 'post__group'
+    )
+    page_obj = paginator(request, notification_list)
+    context = {
+        'page_obj': page_obj,
+    }
+    response = render(request, 'posts/notifications.html', context)
+    mark_read(request.user, [notification.pk for notification in page_obj])
+    return response
+
+
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
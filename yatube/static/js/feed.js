@@ -0,0 +1,56 @@
+// Бесконечная лента: подгружает следующие посты, когда читатель
+// доходит до конца списка. Без JavaScript работает обычная пагинация.
+(function () {
+  'use strict';
+
+  var feed = document.querySelector('[data-feed]');
+  if (!feed || !feed.dataset.next || !('IntersectionObserver' in window)) {
+    return;
+  }
+  var pagination = document.querySelector('.pagination');
+  if (pagination) {
+    pagination.closest('nav').hidden = true;
+  }
+
+  var sentinel = document.createElement('div');
+  feed.after(sentinel);
+  var next = feed.dataset.next;
+  var loading = false;
+
+  var observer = new IntersectionObserver(function (entries) {
+    if (!entries[0].isIntersecting || loading || !next) {
+      return;
+    }
+    loading = true;
+    fetch(next, {credentials: 'same-origin'})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.text();
+      })
+      .then(function (html) {
+        var chunk = document.createElement('div');
+        chunk.innerHTML = html;
+        var marker = chunk.querySelector('[data-next]');
+        next = marker ? marker.dataset.next : null;
+        if (marker) {
+          marker.remove();
+        }
+        feed.append(document.createElement('hr'), ...chunk.childNodes);
+        if (!next) {
+          observer.disconnect();
+        }
+      })
+      .catch(function () {
+        observer.disconnect();
+        if (pagination) {
+          pagination.closest('nav').hidden = false;
+        }
+      })
+      .finally(function () {
+        loading = false;
+      });
+  }, {rootMargin: '600px'});
+  observer.observe(sentinel);
+})();
@@ -0,0 +1,204 @@
+import os
+
+LOGIN_URL = 'users:login'
+
+LOGIN_REDIRECT_URL = 'posts:index'
+
+# Письма ставятся в очередь и уходят командой send_outbox.
+EMAIL_BACKEND = 'core.mail.OutboxEmailBackend'
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_LEASE = 5 * 60
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = '5eoi)30q_lo1vymudi17^w54an!tc3qy_erl9s4&9z#hrl2z2l'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+ALLOWED_HOSTS = [
+    'www.nbaishev.pythonanywhere.com',
+    'nbaishev.pythonanywhere.com',
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'core.apps.CoreConfig',
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.middleware.SurrogateCacheControlMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.SlowQueryViewMiddleware',
+    'core.middleware.NPlusOneMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+# Сессии читаются из кеша, в базу идут только изменения.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+                'core.context_processors.notifications.unread_notifications',
+            ],
+        },
+    },
+]
+
+TEMPLATES_WARM_UP = False
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, os.getenv('YATUBE_DB', 'db.sqlite3')),
+    }
+}
+
+# Реплики только для чтения. Локально это копия базы в отдельном
+# файле: YATUBE_REPLICA_DB=replica.sqlite3, обновляется командой
+# sync_replica.
+DATABASE_REPLICAS = []
+if os.getenv('YATUBE_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, os.environ['YATUBE_REPLICA_DB']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append('replica')
+
+DATABASE_ROUTERS = ['core.db_routers.PrimaryReplicaRouter']
+REPLICA_PIN_COOKIE_NAME = 'pin_primary'
+REPLICA_PIN_SECONDS = 5
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+
+STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# 'nginx' или 'apache': файлы из MEDIA_ROOT отдаёт фронт-сервер.
+MEDIA_ACCEL = None
+# internal-локация nginx, которая смотрит в MEDIA_ROOT.
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = 24 * 60 * 60
+
+POSTS_PER_PAGE: int = 10
+NUMBER_OF_CHARACTERS_IN_TEXT_OF_POST = 15
+POST_EXCERPT_LENGTH = 30
+FORBIDDEN_WORDS = ('блин', 'фига', 'гугл',)
+FOLLOWING_CACHE_TIMEOUT = 60 * 60
+RECOMMENDATIONS_PER_USER = 10
+RECOMMENDATIONS_SHOWN = 5
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_CACHE_TIMEOUT = 60
+TRENDING_GROUPS_SHOWN = 5
+TRENDING_POSTS_SHOWN = 10
+VIEW_COUNTER_FLUSH_INTERVAL = 10
+NOTIFICATIONS_FANOUT_CHUNK = 500
+UNREAD_CACHE_TIMEOUT = 60 * 60
+FEED_ITEMS = 20
+SITEMAP_SHARD_SIZE = 10000
+VERSIONED_CACHE_TIMEOUT = 24 * 60 * 60
+ARCHIVE_AFTER_DAYS = 365
+FRAGMENT_CACHE_TIMEOUT = 60
+PAGE_CACHE_TIMEOUT = 10 * 60
+
+# Внешний HTTP-кеш перед сайтом.
+SURROGATE_MAX_AGE = 60 * 60
+SURROGATE_PURGER = 'core.surrogates.LocalPurger'
+SURROGATE_PURGE_URL = None
+SURROGATE_PURGE_TIMEOUT = 2
+
+# Поиск N+1: None — выключен, 'log' — в лог, 'raise' — ошибкой.
+NPLUSONE_MODE = None
+NPLUSONE_THRESHOLD = 5
+
+# Запросы дольше стольких миллисекунд попадают в лог и в статистику
+# команды slow_queries. None — не замерять.
+SLOW_QUERY_MS = None
+COUNT_CACHE_TIMEOUT = 5 * 60
+MAINTAINED_COUNT_TIMEOUT = 24 * 60 * 60
+COUNT_ESTIMATE_THRESHOLD = 1_000_000
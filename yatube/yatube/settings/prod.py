@@ -0,0 +1,77 @@
+"""Настройки для боевого запуска: ``YATUBE_ENV=prod``."""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, TEMPLATES
+
+DEBUG = False
+
+# Ключ из base.py лежит в репозитории и в бою не годится.
+if not os.environ.get('SECRET_KEY'):
+    raise ImproperlyConfigured('Задайте переменную окружения SECRET_KEY.')
+SECRET_KEY = os.environ['SECRET_KEY']
+
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_TIMEOUT = 10
+
+# Соединение с базой переиспользуется между запросами.
+CONN_MAX_AGE = 60
+
+# Шаблоны читаются и разбираются один раз за жизнь процесса.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# Скомпилировать все шаблоны из templates/ при старте процесса.
+TEMPLATES_WARM_UP = True
+
+# Статика с хешами в именах и сжатыми копиями; отдаёт её
+# core.static_wsgi.StaticFilesApplication из wsgi.py.
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+
+# Кеш, общий для всех рабочих процессов на машине.
+# Перед ним — небольшой LRU в памяти каждого процесса.
+CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.tiered.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 60,
+        },
+    },
+    'shared': {
+        'BACKEND': 'core.cache.sqlite.SQLiteCache',
+        'LOCATION': os.path.join(
+            os.getenv('YATUBE_CACHE_DIR', os.path.join(BASE_DIR, 'cache')),
+            'cache.sqlite3',
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
+SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', 200))
+
+# На стейджинге: NPLUSONE_MODE=log пишет найденные N+1 в лог.
+NPLUSONE_MODE = os.getenv('NPLUSONE_MODE')
+
+# Сброс страниц во внешнем HTTP-кеше по Surrogate-Key.
+if os.getenv('SURROGATE_PURGE_URL'):
+    SURROGATE_PURGER = 'core.surrogates.HTTPPurger'
+    SURROGATE_PURGE_URL = os.environ['SURROGATE_PURGE_URL']
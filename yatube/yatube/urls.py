@@ -14,7 +14,7 @@ urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
 ]
 
-if settings.DEBUG:
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
 
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
@@ -9,8 +9,19 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if not settings.DEBUG and os.path.isdir(settings.STATIC_ROOT):
+    from core.static_wsgi import StaticFilesApplication
+
+    application = StaticFilesApplication(application)
+
+if settings.TEMPLATES_WARM_UP:
+    from core.warmup import warm_up_templates
+
+    warm_up_templates()